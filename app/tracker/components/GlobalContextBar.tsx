@@ -37,7 +37,8 @@ export default function GlobalContextBar() {
     socket.onmessage = (event) => {
       try {
         const json = JSON.parse(event.data);
-        setData(json);
+        // First message is the full snapshot, later ones only carry changed instruments
+        setData((prev) => ({ ...prev, ...json }));
       } catch (err) {
         console.error("❌ Failed to parse WebSocket message:", err);
       }
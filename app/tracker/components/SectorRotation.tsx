@@ -16,27 +16,32 @@ export default function SectorRotation() {
   const [secondsSince, setSecondsSince] = useState<number>(0);
   const [sortDescending, setSortDescending] = useState(true); // true: gainers→losers
 
-  // Fetch & poll data
+  // Initial load over REST, then live pushes over /ws/sector (REST poll stays as fallback)
   useEffect(() => {
+    let raw: Record<string, any> = {};
+
+    function applySectors(next: Record<string, any>) {
+      const parsed: SectorData[] = Object.entries(next)
+        .filter(([, entry]: [string, any]) =>
+          entry && typeof entry.changePercent === 'number' && typeof entry.price === 'number'
+        )
+        .map(([symbol, entry]: [string, any]) => ({
+          symbol,
+          fullName: entry.sector || '',
+          price: entry.price,
+          changePercent: entry.changePercent,
+        }));
+
+      setSectors(parsed);
+      setLastUpdated(new Date());
+    }
+
     async function fetchSectors() {
       try {
         const res = await fetch('/api/sector');
         const json = await res.json();
-        const raw = json.data && typeof json.data === 'object' ? json.data : {};
-
-        const parsed: SectorData[] = Object.entries(raw)
-          .filter(([, entry]: [string, any]) =>
-            entry && typeof entry.changePercent === 'number' && typeof entry.price === 'number'
-          )
-          .map(([symbol, entry]: [string, any]) => ({
-            symbol,
-            fullName: entry.sector || '',
-            price: entry.price,
-            changePercent: entry.changePercent,
-          }));
-
-        setSectors(parsed);
-        setLastUpdated(new Date());
+        raw = json.data && typeof json.data === 'object' ? json.data : {};
+        applySectors(raw);
       } catch (err) {
         console.error('Failed to fetch sector data', err);
         setSectors([]);
@@ -46,8 +51,25 @@ export default function SectorRotation() {
     }
 
     fetchSectors();
-    const interval = setInterval(fetchSectors, 30000);
-    return () => clearInterval(interval);
+    const interval = setInterval(fetchSectors, 60000);
+
+    const proto = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+    const socket = new WebSocket(`${proto}//${window.location.host}/ws/sector`);
+    socket.onmessage = (event) => {
+      try {
+        // First message is the full snapshot, later ones only carry changed ETFs
+        raw = { ...raw, ...JSON.parse(event.data) };
+        applySectors(raw);
+        setLoading(false);
+      } catch (err) {
+        console.error('❌ Failed to parse sector WebSocket message:', err);
+      }
+    };
+
+    return () => {
+      clearInterval(interval);
+      socket.close();
+    };
   }, []);
 
   // Live timer
@@ -1,10 +1,43 @@
 import os
+import re
+import sys
+import time
+import shutil
 import argparse
-from datetime import datetime
+from datetime import datetime, timedelta
+
+import lz4.frame
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from backend import cache_manifest
+from backend import history_store
 
 # --- Config ---
 CACHE_DIR = "backend/cache"
 LAST_CLEAR_FILE = os.path.join(CACHE_DIR, ".last_clear")
+# Long-lived stores (metadata, daily bars, history, manifest) and live state
+PRESERVED_ENTRIES = {"store", ".last_clear", "scrape.lock"}
+# Undated files that stay valid across days (the producer overwrites them)
+REUSABLE_FILES = {"global_context.json"}
+
+# --- Retention policy ---
+# Dated snapshots from before today are lz4-compressed into ARCHIVE_DIR and
+# dropped after ARCHIVE_DAYS (their content is in the history store).
+ARCHIVE_DIR = os.path.join(CACHE_DIR, "archive")
+ARCHIVE_DAYS = int(os.getenv("CACHE_ARCHIVE_DAYS", "30"))
+DATED_FILE = re.compile(r"^(?P<stem>.+)_(?P<date>\d{4}-\d{2}-\d{2})\.(?:json|npz)$")
+# Undated snapshots that are archived under their mtime date
+DAILY_FILES = {"autowatchlist_cache.json"}
+
+# Per-symbol tracker files are evicted least-recently-used first once they
+# exceed the budget; they are rebuilt on demand by the candle service.
+TRACKER_PREFIXES = ("tv_candles_", "tracker_candles_", "tracker_signals_")
+TRACKER_BUDGET_MB = float(os.getenv("CACHE_TRACKER_BUDGET_MB", "256"))
+
+# Per-run scratch: checkpoints from earlier days, orphaned publish temp files
+CHECKPOINT_DIR = os.path.join(CACHE_DIR, "checkpoints")
+PUBLISH_TMP_DIR = os.path.join(CACHE_DIR, ".publish")
+TMP_MAX_AGE_SECONDS = 3600
 
 
 def read_last_clear_date():
@@ -35,7 +68,7 @@ def write_last_clear_date(date):
 
 def clear_cache():
     """
-    Delete all files and directories under CACHE_DIR.
+    Delete all files and directories under CACHE_DIR, except PRESERVED_ENTRIES.
     """
     deleted = 0
     if not os.path.isdir(CACHE_DIR):
@@ -43,6 +76,8 @@ def clear_cache():
         return
 
     for fname in os.listdir(CACHE_DIR):
+        if fname in PRESERVED_ENTRIES:
+            continue
         path = os.path.join(CACHE_DIR, fname)
         try:
             if os.path.isfile(path) or os.path.islink(path):
@@ -61,28 +96,180 @@ def clear_cache():
     print(f"🗑️ Cleared cache directory '{CACHE_DIR}', deleted {deleted} items.")
 
 
-def main(force):
+class RetentionReport:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.policies = {}
+
+    def add(self, policy, files=1, reclaimed=0):
+        entry = self.policies.setdefault(policy, {"files": 0, "bytes": 0})
+        entry["files"] += files
+        entry["bytes"] += reclaimed
+
+    def summary(self):
+        total = sum(p["bytes"] for p in self.policies.values())
+        lines = [f"  {name:<10} {p['files']:>5} files  {p['bytes'] / 1e6:>9.2f} MB" for name, p in self.policies.items()]
+        lines.append(f"♻️ Reclaimed {total / 1e6:.2f} MB in {time.perf_counter() - self.started:.2f}s")
+        return "\n".join(lines)
+
+
+def _file_date(path):
+    return datetime.fromtimestamp(os.path.getmtime(path)).date()
+
+
+def compress_file(path, dest):
+    """lz4-compress `path` to `dest` (temp + rename), remove the original, return bytes saved."""
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    tmp_path = f"{dest}.tmp"
+    with open(path, "rb") as src, lz4.frame.open(tmp_path, "wb") as out:
+        shutil.copyfileobj(src, out, 1 << 20)
+    os.replace(tmp_path, dest)
+    saved = os.path.getsize(path) - os.path.getsize(dest)
+    os.remove(path)
+    return saved
+
+
+def read_archived(name):
+    """Bytes of an archived snapshot, e.g. read_archived("universe_scored_2025-01-02.json")."""
+    with lz4.frame.open(os.path.join(ARCHIVE_DIR, f"{name}.lz4"), "rb") as f:
+        return f.read()
+
+
+def archive_snapshots(today, report):
+    """Compress dated snapshots from before `today` into ARCHIVE_DIR."""
+    for fname in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, fname)
+        if not os.path.isfile(path) or fname.startswith(TRACKER_PREFIXES):
+            continue
+        m = DATED_FILE.match(fname)
+        if m:
+            archived_name = fname
+            date = datetime.strptime(m.group("date"), "%Y-%m-%d").date()
+        elif fname in DAILY_FILES:
+            date = _file_date(path)
+            stem, ext = os.path.splitext(fname)
+            archived_name = f"{stem}_{date.isoformat()}{ext}"
+        else:
+            continue
+        if date >= today:
+            continue
+        try:
+            report.add("archived", reclaimed=compress_file(path, os.path.join(ARCHIVE_DIR, f"{archived_name}.lz4")))
+        except Exception as e:
+            print(f"⚠️ Failed to archive {path}: {e}")
+
+
+def expire_archive(today, report):
+    """Delete archived snapshots older than ARCHIVE_DAYS."""
+    if not os.path.isdir(ARCHIVE_DIR):
+        return
+    cutoff = today - timedelta(days=ARCHIVE_DAYS)
+    for fname in os.listdir(ARCHIVE_DIR):
+        m = DATED_FILE.match(fname[:-len(".lz4")]) if fname.endswith(".lz4") else None
+        if not m or datetime.strptime(m.group("date"), "%Y-%m-%d").date() >= cutoff:
+            continue
+        path = os.path.join(ARCHIVE_DIR, fname)
+        size = os.path.getsize(path)
+        os.remove(path)
+        report.add("expired", reclaimed=size)
+
+
+def evict_tracker_files(report, budget_bytes=None):
+    """Evict per-symbol tracker files, least recently used first, down to the budget."""
+    budget_bytes = TRACKER_BUDGET_MB * 1e6 if budget_bytes is None else budget_bytes
+    files = []
+    for fname in os.listdir(CACHE_DIR):
+        if fname.startswith(TRACKER_PREFIXES):
+            st = os.stat(os.path.join(CACHE_DIR, fname))
+            # atime may be coarse (relatime), so a rewrite also counts as use
+            files.append((max(st.st_atime, st.st_mtime), st.st_size, fname))
+    total = sum(size for _, size, _ in files)
+    for _, size, fname in sorted(files):
+        if total <= budget_bytes:
+            break
+        os.remove(os.path.join(CACHE_DIR, fname))
+        total -= size
+        report.add("evicted", reclaimed=size)
+
+
+def clear_scratch(today, report):
+    """Drop checkpoints from earlier days, orphaned temp files and stale unknown files."""
+    if os.path.isdir(CHECKPOINT_DIR):
+        for fname in os.listdir(CHECKPOINT_DIR):
+            path = os.path.join(CHECKPOINT_DIR, fname)
+            if today.isoformat() not in fname:
+                size = os.path.getsize(path)
+                os.remove(path)
+                report.add("scratch", reclaimed=size)
+    if os.path.isdir(PUBLISH_TMP_DIR):
+        for fname in os.listdir(PUBLISH_TMP_DIR):
+            path = os.path.join(PUBLISH_TMP_DIR, fname)
+            if time.time() - os.path.getmtime(path) > TMP_MAX_AGE_SECONDS:
+                size = os.path.getsize(path)
+                os.remove(path)
+                report.add("scratch", reclaimed=size)
+    # Anything else at the top level from an earlier day is what the old daily wipe removed
+    for fname in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, fname)
+        if (
+            fname in PRESERVED_ENTRIES or fname in REUSABLE_FILES
+            or fname.startswith(TRACKER_PREFIXES) or not os.path.isfile(path)
+        ):
+            continue
+        if _file_date(path) < today:
+            size = os.path.getsize(path)
+            os.remove(path)
+            report.add("scratch", reclaimed=size)
+
+
+def apply_retention(today):
+    """Run every retention policy; returns the report."""
+    report = RetentionReport()
+    if not os.path.isdir(CACHE_DIR):
+        print(f"⚠️ Cache directory '{CACHE_DIR}' not found.")
+        return report
+    archive_snapshots(today, report)
+    expire_archive(today, report)
+    evict_tracker_files(report)
+    clear_scratch(today, report)
+    return report
+
+
+def main(force, wipe=False):
     today = datetime.now().date()
     last_clear = read_last_clear_date()
 
     if last_clear == today and not force:
-        print(f"🗓️ Cache already cleared today ({today}); use --force to override.")
+        print(f"🗓️ Cache retention already ran today ({today}); use --force to override.")
         return
 
-    print(f"🕒 Cache clear started at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    clear_cache()
+    print(f"🕒 Cache retention started at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    # Make sure yesterday's universe/scores/watchlist are in the history store
+    rows = history_store.ingest_latest()
+    print(f"🗄️ History store: {rows} rows ingested")
+    if wipe:
+        clear_cache()
+    else:
+        print(apply_retention(today).summary())
+    # The manifest lives in store/; drop entries for files that were moved or deleted
+    cache_manifest.prune()
     write_last_clear_date(today)
-    print(f"✅ Cache clear completed at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"✅ Cache retention completed at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
-        description="Clear the cache directory once per day, unless forced."
+        description="Apply cache retention policies once per day, unless forced."
     )
     parser.add_argument(
         "-f", "--force",
         action="store_true",
-        help="Force cache clear even if already run today"
+        help="Run even if retention already ran today"
+    )
+    parser.add_argument(
+        "--wipe",
+        action="store_true",
+        help="Delete everything except the long-lived stores (full cold start)"
     )
     args = parser.parse_args()
-    main(force=args.force)
+    main(force=args.force, wipe=args.wipe)
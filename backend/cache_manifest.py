@@ -0,0 +1,241 @@
+# backend/cache_manifest.py
+"""
+Index of the artifacts published into backend/cache.
+
+Producers publish through backend/publish.py, which records each file
+here; readers ask latest(kind) instead of listing the directory and
+stat-ing every candidate. Each entry records kind, date, file name, size,
+sha256, produced_at and a generation number that increases with every
+publish of that kind. File names are relative to backend/cache.
+
+The manifest lives in backend/cache/store/manifest.json (never touched by
+cache retention, invisible to the enrich watchdog). Updates take an fcntl lock
+and replace the file in one rename, so readers in other processes never
+see a half-written index; each process re-reads it only when its mtime
+changes.
+
+Files that predate the manifest, or were copied in by hand, are picked up
+by a one-off directory scan when a kind has no live entry.
+"""
+import os
+import re
+import json
+import hashlib
+import threading
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "cache"))
+STORE_DIR = os.path.join(CACHE_DIR, "store")
+MANIFEST_PATH = os.path.join(STORE_DIR, "manifest.json")
+LOCK_PATH = os.path.join(STORE_DIR, "manifest.lock")
+
+DATE = r"(\d{4}-\d{2}-\d{2})"
+
+# kind -> file name pattern (group 1, when present, is the artifact date)
+KINDS = {
+    "universe": re.compile(rf"^universe_{DATE}\.json$"),
+    "universe_enriched": re.compile(rf"^universe_enriched_{DATE}\.json$"),
+    "universe_scored": re.compile(rf"^universe_scored_{DATE}\.json$"),
+    "autowatchlist": re.compile(r"^autowatchlist_cache.*\.json$"),
+    "post_open_signals": re.compile(rf"^post_open_signals_{DATE}\.json$"),
+    "945_signals": re.compile(rf"^945_signals_{DATE}\.json$"),
+    "sector": re.compile(rf"^sector_{DATE}\.json$"),
+    "global_context": re.compile(r"^global_context\.json$"),
+    "intraday_snapshot": re.compile(rf"^intraday_(?:1m|5m)_{DATE}\.npz$"),
+    "daily_store": re.compile(r"^daily_ohlcv\.npz$"),
+}
+
+_lock = threading.Lock()
+_cache = {"key": None, "index": {"generations": {}, "entries": {}}}
+_scanned = {}   # kind -> cache dir mtime at the last fruitless scan
+
+
+def kind_for(filename):
+    for kind, pattern in KINDS.items():
+        if pattern.match(filename):
+            return kind
+    return None
+
+
+def _checksum(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _empty_index():
+    return {"generations": {}, "entries": {}}
+
+
+def _load_index(f):
+    try:
+        index = json.load(f)
+    except ValueError:
+        return _empty_index()
+    # Anything unrecognised is dropped; the fallback scan re-indexes the files
+    if not isinstance(index, dict) or "entries" not in index:
+        return _empty_index()
+    index.setdefault("generations", {})
+    return index
+
+
+def _entry(kind, path, date=None, body=None):
+    # Relative to the cache dir: just the file name, or e.g. "store/daily_ohlcv.npz"
+    name = os.path.relpath(os.path.abspath(path), CACHE_DIR)
+    if date is None:
+        m = KINDS[kind].match(os.path.basename(name))
+        date = m.group(1) if m and m.groups() else None
+    st = os.stat(path)
+    return {
+        "kind": kind,
+        "date": date or datetime.fromtimestamp(st.st_mtime).strftime("%Y-%m-%d"),
+        "file": name,
+        "size": st.st_size,
+        "sha256": hashlib.sha256(body).hexdigest() if body is not None else _checksum(path),
+        "produced_at": datetime.fromtimestamp(st.st_mtime).isoformat(timespec="milliseconds"),
+    }
+
+
+def _read():
+    """
+    Manifest as {"generations": {kind: n}, "entries": {kind: {file: entry}}},
+    re-read only when the file changed.
+    """
+    try:
+        st = os.stat(MANIFEST_PATH)
+    except FileNotFoundError:
+        return _empty_index()
+    key = (st.st_mtime_ns, st.st_size)
+    with _lock:
+        if _cache["key"] == key:
+            return _cache["index"]
+    try:
+        with open(MANIFEST_PATH, "r") as f:
+            index = _load_index(f)
+    except FileNotFoundError:
+        return _empty_index()
+    with _lock:
+        _cache["key"], _cache["index"] = key, index
+    return index
+
+
+def _update(change):
+    """Apply `change(index)` under the manifest lock and publish it atomically."""
+    os.makedirs(STORE_DIR, exist_ok=True)
+    with _lock, open(LOCK_PATH, "a") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            try:
+                with open(MANIFEST_PATH, "r") as f:
+                    index = _load_index(f)
+            except FileNotFoundError:
+                index = _empty_index()
+            change(index)
+            tmp_path = f"{MANIFEST_PATH}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(index, f, separators=(",", ":"))
+            os.replace(tmp_path, MANIFEST_PATH)
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _add(index, entry):
+    generation = index["generations"].get(entry["kind"], 0) + 1
+    index["generations"][entry["kind"]] = generation
+    entry["generation"] = generation
+    index["entries"].setdefault(entry["kind"], {})[entry["file"]] = entry
+
+
+def record(kind, path, date=None, body=None):
+    """
+    Register a freshly published artifact (`body` spares re-reading it for
+    the checksum) and bump the kind's generation. Never fails the writer.
+    """
+    try:
+        entry = _entry(kind, path, date, body)
+        _update(lambda index: _add(index, entry))
+        return entry
+    except Exception as e:
+        print(f"⚠️ Could not record {path} in cache manifest: {e}")
+        return None
+
+
+def entries(kind):
+    """Indexed entries for `kind`, newest first."""
+    return sorted(_read()["entries"].get(kind, {}).values(), key=lambda e: e["produced_at"], reverse=True)
+
+
+def _first_live(found):
+    # Only the newest few are ever stat-ed; older entries are not touched
+    for entry in found:
+        if os.path.exists(os.path.join(CACHE_DIR, entry["file"])):
+            return entry
+    return None
+
+
+def latest_entry(kind):
+    entry = _first_live(entries(kind))
+    if entry:
+        return entry
+    # Nothing indexed: scan once per directory change for files written outside record()
+    try:
+        dir_mtime = os.stat(CACHE_DIR).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _scanned.get(kind) == dir_mtime:
+        return None
+    _scanned[kind] = dir_mtime
+    if not rebuild(kind):
+        return None
+    return _first_live(entries(kind))
+
+
+def latest(kind):
+    """Path of the newest `kind` artifact, or None."""
+    entry = latest_entry(kind)
+    return os.path.join(CACHE_DIR, entry["file"]) if entry else None
+
+
+def rebuild(kind=None):
+    """Index matching files already in the cache dir. Returns the number recorded."""
+    kinds = [kind] if kind else list(KINDS)
+    found = []
+    for fname in os.listdir(CACHE_DIR):
+        k = kind_for(fname)
+        if k in kinds:
+            found.append(_entry(k, os.path.join(CACHE_DIR, fname)))
+    if found:
+        def change(index):
+            for entry in found:
+                _add(index, entry)
+        _update(change)
+    return len(found)
+
+
+def prune():
+    """Drop entries whose file is gone (e.g. after the daily cache clear)."""
+    def change(index):
+        # Generations are kept so they never repeat for a kind
+        by_kind = index["entries"]
+        for kind in list(by_kind):
+            by_kind[kind] = {
+                name: entry for name, entry in by_kind[kind].items()
+                if os.path.exists(os.path.join(CACHE_DIR, name))
+            }
+            if not by_kind[kind]:
+                del by_kind[kind]
+    if os.path.exists(MANIFEST_PATH):
+        _update(change)
+
+
+if __name__ == "__main__":
+    print(f"📒 Indexed {rebuild()} cached artifact(s) into {MANIFEST_PATH}")
@@ -1,10 +1,17 @@
 ## enrich_universe.py
-import json
 import os
+import sys
 from datetime import datetime
 import pytz 
 from pytz import timezone
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from backend.signals.fundamentals_cache import get_short_percent
+from backend import serialization
+from backend import cache_manifest
+from backend.publish import publish_json
+from backend import history_store
+
 # --- Setup ---
 CACHE_DIR = "backend/cache"
 GAP_THRESHOLD = 0.005  # 0.5% gap threshold (can be made dynamic later)
@@ -16,8 +23,7 @@ def load_json(path):
         print(f"⚠️ Warning: Cache file missing: {path}")
         return {}
     try:
-        with open(path, "r") as f:
-            return json.load(f)
+        return serialization.load(path)
     except Exception as e:
         print(f"❌ Error loading {path}: {e}")
         return {}
@@ -26,20 +32,10 @@ def load_json(path):
 TODAY = datetime.now(timezone("US/Eastern")).strftime("%Y-%m-%d")
 
 def get_latest_universe_file():
-    files = []
-    for f in os.listdir(CACHE_DIR):
-        if f.startswith("universe_") and f.endswith(".json"):
-            date_part = f[len("universe_"):-len(".json")]
-            try:
-                # validate YYYY-MM-DD format
-                datetime.strptime(date_part, "%Y-%m-%d")
-                files.append(f)
-            except ValueError:
-                continue
-    if not files:
+    path = cache_manifest.latest("universe")
+    if path is None:
         raise FileNotFoundError("❌ No dated universe files found in cache.")
-    files.sort(key=lambda f: os.path.getmtime(os.path.join(CACHE_DIR, f)), reverse=True)
-    return os.path.join(CACHE_DIR, files[0])
+    return path
 
 UNIVERSE_PATH = get_latest_universe_file()
 current_date_str = datetime.now(pytz.timezone("America/New_York")).strftime("%Y-%m-%d")
@@ -198,32 +194,22 @@ def enrich_with_multi_day_levels(universe, multi_day_data):
             info["lo_10d"] = data["lo_10d"]
     return universe
 
-def enrich_with_short_interest(universe, tv_signals):
+def enrich_with_short_interest(universe, fundamentals):
     """
-    Pulls normalized tv_signals[symbol]["shortPercentOfFloat"] → universe[...]["shortPercentOfFloat"]
+    Pulls cached shortPercentOfFloat from the fundamentals store → universe[...]["shortPercentOfFloat"]
     and pre-flags squeeze_watch when criteria are met.
     """
-    # Normalize tv_signals keys first (matching enrich_with_tv_signals)
-    normalized_tv_data = {}
-    for k, v in tv_signals.items():
-        base = k.split(".")[0].upper()
-        normalized_tv_data[base] = v
-
     flagged = 0
     for symbol, info in universe.items():
-        tv = normalized_tv_data.get(symbol.upper(), {})
-        sp = tv.get("shortPercentOfFloat")
+        sp = get_short_percent(fundamentals, symbol.upper())
         if sp is None:
             continue
 
         # Store shortPercentOfFloat in universe data
         info["shortPercentOfFloat"] = sp
 
-        rel_vol = info.get("rel_vol", 0)
-        pct_change = abs(info.get("pct_change", 0))
-
-        # Debugging output
-        print(f"🔍 {symbol}: short%={sp:.3f}, rel_vol={rel_vol:.2f}, pct_change={pct_change:.2f}%")
+        rel_vol = info.get("rel_vol") or 0
+        pct_change = abs(info.get("pct_change") or 0)
 
         # Squeeze Watch logic
         if sp >= 0.1 and rel_vol > 1.0 and pct_change >= 1.0:
@@ -373,6 +359,9 @@ def main():
 
     print("🚀 Starting enrichment...")
     print(f"📦 Loaded {len(universe)} tickers")
+    if post_open.get("partial"):
+        # Watchdog re-runs us on every republish until the final write lands
+        print(f"⏳ Post-open signals still streaming — enriching with {len(tv_signals)} tickers so far")
 
     try:
         universe = enrich_with_tv_signals(universe, tv_signals)
@@ -416,9 +405,9 @@ def main():
     t3_hits = sum(1 for x in universe.values() if x.get("tierHits", {}).get("T3"))
     print(f"✅ Tier 2 hits: {t2_hits}, Tier 3 hits: {t3_hits}")
 
-    with open(OUTPUT_PATH, "w") as f:
-        json.dump(universe, f, indent=2)
+    publish_json(OUTPUT_PATH, universe, kind="universe_enriched")
     print(f"✅ Enriched universe saved to {OUTPUT_PATH}")
+    history_store.ingest_latest(["universe_enriched"])
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
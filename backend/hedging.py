@@ -0,0 +1,179 @@
+# backend/hedging.py
+"""
+Per-call timeouts, hedged requests and per-source circuit breakers.
+
+hedged_call() starts the preferred source and, if it has not answered
+within the observed HEDGE_PERCENTILE latency for that kind of call, fires
+the next source in line; the first success wins. A failed attempt moves
+on to the next source immediately. Nothing waits past the timeout.
+
+Each upstream source has a breaker: after BREAKER_FAILURES consecutive
+failures it opens and calls to that source fail fast for
+BREAKER_RESET_SECONDS, after which traffic is let through again and the
+next outcome decides whether it stays closed.
+
+Scope: only calls made inside the post-open/9:45 publish window go
+through here. That is the per-ticker daily bar and the sector quotes
+(yfinance hedged by TradingView), plus the intraday snapshot downloads,
+which have no second source and use hedged_call just for the timeout and
+breaker. Off-hours jobs (universe, fundamentals, daily store) and the
+tracker's TradingView candles call providers directly.
+"""
+import os
+import time
+import threading
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+FETCH_TIMEOUT_SECONDS = float(os.getenv("FETCH_TIMEOUT_SECONDS", "10"))
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+# Used until enough latencies are observed, and as a floor afterwards
+HEDGE_DELAY_SECONDS = float(os.getenv("HEDGE_DELAY_SECONDS", "2.0"))
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "8"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+
+# Attempts run here so a hung call can be abandoned; sized for the
+# post-open worker pool with one hedge each, plus slack for stragglers
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("HEDGE_THREADS", "32")), thread_name_prefix="hedge")
+
+
+class CircuitOpenError(Exception):
+    """Source is failing; call skipped without touching the network."""
+
+
+class CircuitBreaker:
+    def __init__(self, source, failures=BREAKER_FAILURES, reset_seconds=BREAKER_RESET_SECONDS):
+        self.source = source
+        self.threshold = failures
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            # Half-open once the reset window passes; the next outcome decides
+            return time.time() - self.opened_at >= self.reset_seconds
+
+    def record(self, success):
+        with self._lock:
+            if success:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.failures >= self.threshold:
+                if self.opened_at is None:
+                    self.trips += 1
+                    print(f"🔌 {self.source}: circuit open after {self.failures} consecutive failures")
+                self.opened_at = time.time()
+
+    def status(self):
+        with self._lock:
+            if self.opened_at is None:
+                state = "closed"
+            elif time.time() - self.opened_at >= self.reset_seconds:
+                state = "half_open"
+            else:
+                state = "open"
+            return {"state": state, "consecutive_failures": self.failures, "trips": self.trips}
+
+
+_breakers = {}
+_latencies = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+_stats = defaultdict(Counter)
+_lock = threading.Lock()
+
+
+def get_breaker(source):
+    with _lock:
+        if source not in _breakers:
+            _breakers[source] = CircuitBreaker(source)
+        return _breakers[source]
+
+
+def hedge_delay(kind):
+    """Observed HEDGE_PERCENTILE latency for `kind`, never below HEDGE_DELAY_SECONDS."""
+    with _lock:
+        samples = sorted(_latencies[kind])
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DELAY_SECONDS
+    idx = min(int(len(samples) * HEDGE_PERCENTILE / 100), len(samples) - 1)
+    return max(samples[idx], HEDGE_DELAY_SECONDS)
+
+
+def hedged_call(kind, attempts, timeout=FETCH_TIMEOUT_SECONDS):
+    """
+    Run `attempts` ([(source, fn), ...] in preference order) as hedged
+    requests and return (result, source) from the first that succeeds.
+    `kind` groups calls for latency tracking, e.g. "daily_bar".
+    """
+    queue = [(source, fn) for source, fn in attempts if get_breaker(source).allow()]
+    if not queue:
+        raise CircuitOpenError(f"All sources open for {kind}: {[s for s, _ in attempts]}")
+
+    started = time.perf_counter()
+    give_up_at = started + timeout
+    delay = hedge_delay(kind)
+    pending, errors = {}, []
+    last_launch = None
+
+    def launch():
+        nonlocal last_launch
+        source, fn = queue.pop(0)
+        if pending or errors:
+            with _lock:
+                _stats[kind]["hedges"] += 1
+        last_launch = time.perf_counter()
+        pending[_executor.submit(fn)] = (source, last_launch)
+
+    launch()
+    while pending:
+        now = time.perf_counter()
+        wait_for = give_up_at - now
+        if queue:
+            wait_for = min(wait_for, last_launch + delay - now)
+        done, _ = wait(list(pending), timeout=max(wait_for, 0), return_when=FIRST_COMPLETED)
+
+        for future in done:
+            source, launched = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                errors.append(f"{source}: {e}")
+                continue
+            with _lock:
+                _latencies[kind].append(time.perf_counter() - launched)
+                _stats[kind][f"served_by_{source}"] += 1
+            return result, source
+
+        now = time.perf_counter()
+        if now >= give_up_at:
+            for source, _ in pending.values():
+                get_breaker(source).record(False)
+            with _lock:
+                _stats[kind]["timeouts"] += 1
+            sources = ", ".join(s for s, _ in pending.values())
+            raise TimeoutError(f"{kind} timed out after {timeout:.1f}s waiting on {sources}")
+        # Hedge when the in-flight attempt is slow, or fail over at once when it errored
+        if queue and (done or not pending or now >= last_launch + delay):
+            launch()
+
+    raise RuntimeError(f"{kind} failed on every source: {'; '.join(errors)}")
+
+
+def hedging_report():
+    """Which sources served each kind of call, hedges fired, timeouts and breaker state."""
+    with _lock:
+        stats = {kind: dict(counter) for kind, counter in _stats.items()}
+        breakers = dict(_breakers)
+    return {
+        "calls": stats,
+        "breakers": {source: breaker.status() for source, breaker in breakers.items()},
+    }
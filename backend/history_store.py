@@ -0,0 +1,317 @@
+# backend/history_store.py
+"""
+Day-by-day history of the enriched universe, scores and watchlist.
+
+cache_manager's retention pass archives earlier days' snapshots and expires
+the archives after CACHE_ARCHIVE_DAYS, so the files are not a history. After
+each pipeline stage publishes, and once more before that pass, the day's
+files are ingested into a SQLite database in backend/cache/store/history.db,
+which retention never touches.
+
+Tables
+  symbol_days  one row per (date, symbol): sector, level, score, watchlist
+               flag and tags, plus the raw enriched/scored entries as JSON
+  signal_hits  one row per (date, signal, symbol) for every signal that fired
+  ingests      which artifact (kind, file, sha256) each date was built from
+
+Indexed by (date, symbol), (date, signal) and (date, score); symbol-first
+indexes serve per-ticker history. Ingesting a date replaces what was there,
+so the watchdog's repeated enrich runs leave one row per symbol.
+
+    python backend/history_store.py            # ingest today's files
+    python backend/history_store.py --backfill # every file in the manifest
+"""
+import os
+import sys
+import sqlite3
+import argparse
+from contextlib import contextmanager
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from backend import serialization
+from backend import cache_manifest
+
+DB_PATH = os.path.join(cache_manifest.STORE_DIR, "history.db")
+
+# Manifest kinds the store ingests, in pipeline order
+KINDS = ("universe_enriched", "universe_scored", "autowatchlist")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS symbol_days (
+    date         TEXT NOT NULL,
+    symbol       TEXT NOT NULL,
+    sector       TEXT,
+    level        TEXT,
+    score        REAL,
+    on_watchlist INTEGER NOT NULL DEFAULT 0,
+    tags         TEXT,
+    enriched     TEXT,
+    scored       TEXT,
+    PRIMARY KEY (date, symbol)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_symbol_days_score ON symbol_days (date, score DESC);
+CREATE INDEX IF NOT EXISTS idx_symbol_days_symbol ON symbol_days (symbol, date);
+
+CREATE TABLE IF NOT EXISTS signal_hits (
+    date   TEXT NOT NULL,
+    signal TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    PRIMARY KEY (date, signal, symbol)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_signal_hits_symbol ON signal_hits (symbol, signal, date);
+
+CREATE TABLE IF NOT EXISTS ingests (
+    date        TEXT NOT NULL,
+    kind        TEXT NOT NULL,
+    file        TEXT NOT NULL,
+    sha256      TEXT,
+    rows        INTEGER,
+    ingested_at TEXT NOT NULL,
+    PRIMARY KEY (date, kind)
+);
+"""
+
+
+_schema_ready = False
+
+
+@contextmanager
+def _connect():
+    global _schema_ready
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    # Re-check after a `cache_manager.py --wipe` or a manual delete of the db
+    fresh = not _schema_ready or not os.path.exists(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    try:
+        if fresh:
+            # WAL: API reads never block on a pipeline ingest
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            _schema_ready = True
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _json(obj):
+    return serialization.dumps(obj).decode()
+
+
+def _fired(signals):
+    return sorted(name for name, value in (signals or {}).items() if value)
+
+
+# --- Ingest ---
+
+def _ingest_enriched(conn, date, universe):
+    conn.execute("DELETE FROM signal_hits WHERE date = ?", (date,))
+    conn.executemany(
+        """
+        INSERT INTO symbol_days (date, symbol, sector, level, enriched)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (date, symbol) DO UPDATE SET
+            sector = excluded.sector, level = excluded.level, enriched = excluded.enriched
+        """,
+        [(date, symbol, info.get("sector"), info.get("level"), _json(info)) for symbol, info in universe.items()],
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO signal_hits (date, signal, symbol) VALUES (?, ?, ?)",
+        [(date, sig, symbol) for symbol, info in universe.items() for sig in _fired(info.get("signals"))],
+    )
+    return len(universe)
+
+
+def _ingest_scored(conn, date, scored):
+    conn.execute("UPDATE symbol_days SET score = NULL, scored = NULL WHERE date = ?", (date,))
+    conn.executemany(
+        """
+        INSERT INTO symbol_days (date, symbol, sector, level, score, scored)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (date, symbol) DO UPDATE SET score = excluded.score, scored = excluded.scored
+        """,
+        [
+            (date, symbol, info.get("sector"), info.get("level"), info.get("score"), _json(info))
+            for symbol, info in scored.items()
+        ],
+    )
+    # Scored-only signals (e.g. when the enriched file was never ingested)
+    conn.executemany(
+        "INSERT OR IGNORE INTO signal_hits (date, signal, symbol) VALUES (?, ?, ?)",
+        [(date, sig, symbol) for symbol, info in scored.items() for sig in _fired(info.get("signals"))],
+    )
+    return len(scored)
+
+
+def _ingest_watchlist(conn, date, watchlist):
+    conn.execute("UPDATE symbol_days SET on_watchlist = 0, tags = NULL WHERE date = ?", (date,))
+    conn.executemany(
+        """
+        INSERT INTO symbol_days (date, symbol, sector, level, score, on_watchlist, tags)
+        VALUES (?, ?, ?, ?, ?, 1, ?)
+        ON CONFLICT (date, symbol) DO UPDATE SET on_watchlist = 1, tags = excluded.tags
+        """,
+        [
+            (date, symbol, info.get("sector"), info.get("level"), info.get("score"), _json(info.get("tags", [])))
+            for symbol, info in watchlist.items()
+        ],
+    )
+    return len(watchlist)
+
+
+INGESTERS = {
+    "universe_enriched": _ingest_enriched,
+    "universe_scored": _ingest_scored,
+    "autowatchlist": _ingest_watchlist,
+}
+
+
+def ingest_entry(entry):
+    """Ingest one manifest entry; skipped when that exact file is already in."""
+    path = os.path.join(cache_manifest.CACHE_DIR, entry["file"])
+    with _connect() as conn:
+        done = conn.execute(
+            "SELECT sha256 FROM ingests WHERE date = ? AND kind = ?", (entry["date"], entry["kind"])
+        ).fetchone()
+        if done and entry.get("sha256") and done["sha256"] == entry["sha256"]:
+            return 0
+        data = serialization.load(path)
+        rows = INGESTERS[entry["kind"]](conn, entry["date"], data)
+        conn.execute(
+            "INSERT OR REPLACE INTO ingests (date, kind, file, sha256, rows, ingested_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (entry["date"], entry["kind"], entry["file"], entry.get("sha256"), rows, datetime.now().isoformat(timespec="seconds")),
+        )
+    return rows
+
+
+def ingest_latest(kinds=KINDS):
+    """Ingest the newest artifact of each kind. Never fails the caller."""
+    total = 0
+    for kind in kinds:
+        entry = cache_manifest.latest_entry(kind)
+        if entry is None:
+            continue
+        try:
+            total += ingest_entry(entry)
+        except Exception as e:
+            print(f"⚠️ History ingest failed for {entry['file']}: {e}")
+    return total
+
+
+def backfill():
+    """Ingest every artifact still in the manifest, oldest first."""
+    total = 0
+    for kind in KINDS:
+        for entry in reversed(cache_manifest.entries(kind)):
+            if os.path.exists(os.path.join(cache_manifest.CACHE_DIR, entry["file"])):
+                total += ingest_entry(entry)
+    return total
+
+
+# --- Queries ---
+
+def dates(limit=None):
+    """Ingested session dates, newest first."""
+    sql = "SELECT DISTINCT date FROM symbol_days ORDER BY date DESC"
+    params = ()
+    if limit:
+        sql += " LIMIT ?"
+        params = (limit,)
+    with _connect() as conn:
+        return [r["date"] for r in conn.execute(sql, params)]
+
+
+def signal_days(symbol, signal, start=None, end=None):
+    """Every date `symbol` fired `signal`, newest first."""
+    with _connect() as conn:
+        rows = conn.execute(
+            """
+            SELECT date FROM signal_hits
+            WHERE symbol = ? AND signal = ? AND date >= ? AND date <= ?
+            ORDER BY date DESC
+            """,
+            (symbol.upper(), signal, start or "0000-00-00", end or "9999-99-99"),
+        )
+        return [r["date"] for r in rows]
+
+
+def signal_symbols(signal, date):
+    """Symbols that fired `signal` on `date`."""
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT symbol FROM signal_hits WHERE date = ? AND signal = ? ORDER BY symbol", (date, signal)
+        )
+        return [r["symbol"] for r in rows]
+
+
+def top_scored(sessions=30, limit=10):
+    """{date: [{symbol, score, sector, on_watchlist}, ...]} for the last `sessions` scored dates."""
+    out = {}
+    with _connect() as conn:
+        recent = conn.execute(
+            "SELECT DISTINCT date FROM symbol_days WHERE score IS NOT NULL ORDER BY date DESC LIMIT ?",
+            (sessions,),
+        ).fetchall()
+        # One (date, score) index range scan per session
+        for r in recent:
+            rows = conn.execute(
+                """
+                SELECT symbol, score, sector, on_watchlist FROM symbol_days
+                WHERE date = ? AND score IS NOT NULL
+                ORDER BY score DESC, symbol LIMIT ?
+                """,
+                (r["date"], limit),
+            )
+            out[r["date"]] = [
+                {"symbol": x["symbol"], "score": x["score"], "sector": x["sector"], "on_watchlist": bool(x["on_watchlist"])}
+                for x in rows
+            ]
+    return out
+
+
+def symbol_history(symbol, start=None, end=None, full=False):
+    """Per-day rows for `symbol`, newest first; `full` adds the stored enriched/scored entries."""
+    symbol = symbol.upper()
+    params = (symbol, start or "0000-00-00", end or "9999-99-99")
+    with _connect() as conn:
+        days = conn.execute(
+            """
+            SELECT * FROM symbol_days
+            WHERE symbol = ? AND date >= ? AND date <= ?
+            ORDER BY date DESC
+            """,
+            params,
+        ).fetchall()
+        hits = {}
+        for r in conn.execute(
+            "SELECT date, signal FROM signal_hits WHERE symbol = ? AND date >= ? AND date <= ?", params
+        ):
+            hits.setdefault(r["date"], []).append(r["signal"])
+
+    out = []
+    for r in days:
+        row = {
+            "date": r["date"],
+            "score": r["score"],
+            "sector": r["sector"],
+            "level": r["level"],
+            "on_watchlist": bool(r["on_watchlist"]),
+            "tags": serialization.loads(r["tags"]) if r["tags"] else [],
+            "signals": sorted(hits.get(r["date"], [])),
+        }
+        if full:
+            row["enriched"] = serialization.loads(r["enriched"]) if r["enriched"] else None
+            row["scored"] = serialization.loads(r["scored"]) if r["scored"] else None
+        out.append(row)
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest cached universe/score/watchlist files into the history store.")
+    parser.add_argument("--backfill", action="store_true", help="Ingest every file still listed in the cache manifest")
+    args = parser.parse_args()
+    count = backfill() if args.backfill else ingest_latest()
+    print(f"🗄️ History store: {count} rows ingested into {DB_PATH}")
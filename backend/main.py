@@ -1,28 +1,47 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-import json
 import os
-import re
 from datetime import datetime
 
 # --- Route imports ---
 from backend.routes import api_global_context
 from backend.signals import fetch_global_context  # WebSocket route
+from backend.signals import sector_signals  # In-process sector service + WebSocket route
 from backend.routes import tracker_router as tracker_module
 from backend.routes import raw_candles
 from backend.routes import tracker_candles
 from backend.routes import system_status_router  # <-- NEW: mount status router
-
-app = FastAPI()
+from backend.routes import history_router
+from backend import serialization
+from backend.serialization import FastJSONResponse
+from backend.snapshot_cache import snapshot_cache
+from backend import cache_manifest
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Read endpoints serve from memory; load today's files before the first poll
+    warmed = snapshot_cache.warm(SNAPSHOT_KINDS)
+    print(f"🔥 Snapshot cache warmed with {warmed} file(s)")
+    # Single background producer for /ws/global_context and /api/global_context
+    await fetch_global_context.start_context_service()
+    await sector_signals.start_sector_service()
+    yield
+    await sector_signals.sector_hub.stop()
+    await fetch_global_context.context_hub.stop()
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # --- Register routers ---
 app.include_router(api_global_context.router, prefix="/api")
 app.include_router(fetch_global_context.router)
+app.include_router(sector_signals.router)
 app.include_router(tracker_module.router, prefix="/api")
 app.include_router(raw_candles.router)
 app.include_router(tracker_candles.router)
 app.include_router(system_status_router.router, prefix="/api")  # <-- NEW
+app.include_router(history_router.router, prefix="/api")
 
 # --- CORS setup ---
 app.add_middleware(
@@ -35,102 +54,93 @@ app.add_middleware(
 
 CACHE_DIR = "backend/cache"
 
+# Manifest kinds behind the read endpoints, for prewarming
+SNAPSHOT_KINDS = ["universe_scored", "universe_enriched", "universe", "autowatchlist", "sector", "global_context"]
+
 # --- Utility Functions ---
 def load_json_file(path: str, label: str):
     if not os.path.exists(path):
         return JSONResponse({"error": f"{label} not found at path: {path}"}, status_code=404)
-    with open(path, "r") as f:
-        return json.load(f)
-
-def load_latest_file(prefix: str, label: str, required=True):
-    files = [f for f in os.listdir(CACHE_DIR) if f.startswith(prefix) and f.endswith(".json")]
-    if not files:
-        if required:
-            return {"error": f"No file found for {label} with prefix {prefix}"}
-        else:
-            return {}
-    files.sort(key=lambda f: os.path.getmtime(os.path.join(CACHE_DIR, f)), reverse=True)
-    path = os.path.join(CACHE_DIR, files[0])
-    with open(path, "r") as f:
-        return json.load(f)
+    return serialization.load(path)
+
+def serve_latest_file(kind: str, label: str, request: Request, required=True):
+    # Cache files are already JSON: serve the bytes held in memory until the file
+    # changes, or a 304 when the client already has this generation
+    response = snapshot_cache.latest_response(kind, request)
+    if response is None:
+        return FastJSONResponse({"error": f"No file found for {label} ({kind})"} if required else {})
+    return response
 
 # --- API Endpoints ---
 @app.get("/api/scored")
-async def get_universe():
-    return JSONResponse(content=load_latest_file("universe_scored_", "Scored Universe"))
+async def get_universe(request: Request):
+    return serve_latest_file("universe_scored", "Scored Universe", request)
 
 @app.get("/api/enriched")
-async def get_universe_enriched():
-    return JSONResponse(content=load_latest_file("universe_enriched_", "Enriched Universe"))
+async def get_universe_enriched(request: Request):
+    return serve_latest_file("universe_enriched", "Enriched Universe", request)
 
 @app.get("/api/raw")
-async def get_universe_raw():
-    pattern = re.compile(r"^universe_\d{4}-\d{2}-\d{2}\.json$")
-    files = [f for f in os.listdir(CACHE_DIR) if pattern.match(f)]
-    if not files:
+async def get_universe_raw(request: Request):
+    response = snapshot_cache.latest_response("universe", request)
+    if response is None:
         return JSONResponse({"error": "No raw universe file found with format universe_YYYY-MM-DD.json"}, status_code=404)
-    files.sort(key=lambda f: os.path.getmtime(os.path.join(CACHE_DIR, f)), reverse=True)
-    latest_file = os.path.join(CACHE_DIR, files[0])
-    with open(latest_file, "r") as f:
-        return JSONResponse(content=json.load(f))
+    return response
 
 @app.get("/api/sector")
-async def get_sector_rotation():
-    files = [f for f in os.listdir(CACHE_DIR) if f.startswith("sector_") and f.endswith(".json")]
-    if not files:
-        return JSONResponse(content={"error": "No sector_<date>.json file found"}, status_code=404)
-
-    files.sort(key=lambda f: os.path.getmtime(os.path.join(CACHE_DIR, f)), reverse=True)
-    latest_filename = files[0]
-    latest_path = os.path.join(CACHE_DIR, latest_filename)
+async def get_sector_rotation(request: Request):
+    # Latest snapshot lives in memory; the dated file is history / cold-start fallback
+    snapshot = sector_signals.sector_hub.latest
+    if snapshot is not None:
+        # Encoded once per producer tick, not once per poll; 304 until the next tick
+        return snapshot_cache.encoded_response(
+            "sector", snapshot,
+            lambda s: {"date": sector_signals.snapshot_date(s), "data": s},
+            request=request,
+        )
 
     try:
-        with open(latest_path, "r") as f:
-            sector_data = json.load(f)
-
-        file_date = latest_filename[len("sector_"):-len(".json")]
-
-        return JSONResponse(content={
-            "date": file_date,
-            "data": sector_data
-        })
-
+        file_date, sector_data = sector_signals.load_latest_snapshot()
     except Exception as e:
         return JSONResponse(
-            content={"error": f"Failed to load or parse {latest_filename} — {str(e)}"},
+            content={"error": f"Failed to load or parse latest sector file — {str(e)}"},
             status_code=500
         )
+    if sector_data is None:
+        return JSONResponse(content={"error": "No sector_<date>.json file found"}, status_code=404)
+
+    return FastJSONResponse(content={
+        "date": file_date,
+        "data": sector_data
+    })
 
 @app.get("/api/autowatchlist")
-async def get_watchlist():
-    return JSONResponse(content=load_latest_file("autowatchlist_cache", "AutoWatchlist"))
+async def get_watchlist(request: Request):
+    return serve_latest_file("autowatchlist", "AutoWatchlist", request)
 
 @app.get("/api/cache-timestamps")
 async def get_cache_timestamps():
-    tracked_files = [
-        "post_open_signals",
-        "945_signals",
-        "universe_enriched",
-        "universe_scored",
-        "autowatchlist_cache",
-        "global_context.json"
-    ]
+    # Response key -> manifest kind
+    tracked_files = {
+        "post_open_signals": "post_open_signals",
+        "945_signals": "945_signals",
+        "universe_enriched": "universe_enriched",
+        "universe_scored": "universe_scored",
+        "autowatchlist_cache": "autowatchlist",
+        "global_context.json": "global_context",
+    }
 
     now = datetime.now()
     freshness_minutes = 1440
     output = {}
 
-    for prefix in tracked_files:
-        matching = [f for f in os.listdir(CACHE_DIR) if f.startswith(prefix)]
-        if matching:
-            matching.sort(key=lambda f: os.path.getmtime(os.path.join(CACHE_DIR, f)), reverse=True)
-            f = matching[0]
-            full_path = os.path.join(CACHE_DIR, f)
-            modified_ts = os.path.getmtime(full_path)
-            modified_dt = datetime.fromtimestamp(modified_ts)
+    for prefix, kind in tracked_files.items():
+        entry = cache_manifest.latest_entry(kind)
+        if entry:
+            modified_dt = datetime.fromisoformat(entry["produced_at"])
             is_fresh = (now - modified_dt).total_seconds() < freshness_minutes * 60
             output[prefix] = {
-                "filename": f,
+                "filename": entry["file"],
                 "last_modified": modified_dt.strftime("%Y-%m-%d %H:%M:%S"),
                 "is_fresh": is_fresh
             }
@@ -141,4 +151,4 @@ async def get_cache_timestamps():
                 "is_fresh": False
             }
 
-    return JSONResponse(content=output)
+    return FastJSONResponse(content=output)
@@ -0,0 +1,314 @@
+# backend/market_data.py
+"""
+Pluggable market-data provider used by every fetch path.
+
+MARKET_DATA_MODE selects the backend:
+  live    – yfinance / TvDatafeed (default)
+  record  – live, and every response is captured under MARKET_DATA_DIR
+  replay  – serve captured responses from MARKET_DATA_DIR with injected
+            latency, jitter, errors and throttling (no network)
+
+Whatever the mode, calls are paced by the per-source adaptive limiter in
+backend/rate_limiter.py, which also sees every 429 and error, and are
+refused outright while that source's circuit breaker (backend/hedging.py)
+is open.
+"""
+import os
+import json
+import time
+import atexit
+import pickle
+import random
+import hashlib
+import threading
+from collections import Counter
+from datetime import datetime, date
+
+from backend.rate_limiter import get_limiter, is_throttle_error
+from backend.hedging import get_breaker, CircuitOpenError
+
+CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "cache"))
+DEFAULT_RECORD_DIR = os.path.join(CACHE_DIR, "store", "recordings")
+
+# Arguments that move with the clock; ignored when falling back to a loose replay match
+TIME_KWARGS = ("start", "end", "period")
+
+# Upstream source behind each provider method, for rate limiting
+METHOD_SOURCES = {
+    "history": "yfinance",
+    "download": "yfinance",
+    "info": "yfinance",
+    "tv_hist": "tradingview",
+}
+# yf.download issues one request per ticker under the hood, but batches them
+# tightly; charge a fraction of a token per ticker
+DOWNLOAD_COST_PER_TICKER = float(os.getenv("DOWNLOAD_COST_PER_TICKER", "0.1"))
+
+
+class ProviderError(Exception):
+    """Upstream call failed."""
+
+
+class ThrottledError(ProviderError):
+    """Upstream rejected the call for rate reasons (HTTP 429 or equivalent)."""
+
+
+def _normalize(value):
+    if isinstance(value, (list, tuple, set)):
+        return [_normalize(v) for v in (sorted(value) if isinstance(value, set) else value)]
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in sorted(value.items())}
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "name") and hasattr(value, "value"):  # Enum (e.g. tvDatafeed Interval)
+        return f"{type(value).__name__}.{value.name}"
+    return value
+
+
+def call_key(method, args, kwargs, loose=False):
+    if loose:
+        kwargs = {k: v for k, v in kwargs.items() if k not in TIME_KWARGS}
+    payload = json.dumps([method, _normalize(list(args)), _normalize(kwargs)], default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class LiveProvider:
+    """
+    Direct yfinance / TvDatafeed calls. TvDatafeed keeps its websocket on
+    the instance, so concurrent get_hist calls on one instance clobber each
+    other's connection; each thread gets its own session instead.
+    """
+
+    name = "live"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @property
+    def tv(self):
+        tv = getattr(self._local, "tv", None)
+        if tv is None:
+            from tvDatafeed import TvDatafeed
+            tv = self._local.tv = TvDatafeed()
+        return tv
+
+    def history(self, symbol, **kwargs):
+        import yfinance as yf
+        return yf.Ticker(symbol).history(**kwargs)
+
+    def download(self, tickers, **kwargs):
+        import yfinance as yf
+        return yf.download(tickers, **kwargs)
+
+    def info(self, symbol):
+        import yfinance as yf
+        return yf.Ticker(symbol).info
+
+    def tv_hist(self, symbol, **kwargs):
+        return self.tv.get_hist(symbol=symbol, **kwargs)
+
+
+class RecordingProvider:
+    """Wraps a provider and pickles every response (or error) to disk."""
+
+    name = "record"
+
+    def __init__(self, inner, record_dir):
+        self.inner = inner
+        self.record_dir = record_dir
+        self.counts = Counter()
+        os.makedirs(record_dir, exist_ok=True)
+
+    def _call(self, method, *args, **kwargs):
+        self.counts[method] += 1
+        started = time.perf_counter()
+        try:
+            result, error = getattr(self.inner, method)(*args, **kwargs), None
+        except Exception as e:
+            result, error = None, e
+        entry = {
+            "method": method,
+            "args": args,
+            "kwargs": kwargs,
+            "result": result,
+            "error": repr(error) if error else None,
+            "throttled": is_throttle_error(error),
+            "latency": time.perf_counter() - started,
+            "recorded_at": datetime.now().isoformat(),
+        }
+        for key in (call_key(method, args, kwargs), call_key(method, args, kwargs, loose=True)):
+            path = os.path.join(self.record_dir, f"{key}.pkl")
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(entry, f)
+            os.replace(tmp_path, path)
+        if error:
+            raise error
+        return result
+
+    def history(self, symbol, **kwargs):
+        return self._call("history", symbol, **kwargs)
+
+    def download(self, tickers, **kwargs):
+        return self._call("download", tickers, **kwargs)
+
+    def info(self, symbol):
+        return self._call("info", symbol)
+
+    def tv_hist(self, symbol, **kwargs):
+        return self._call("tv_hist", symbol, **kwargs)
+
+    def report(self):
+        print(f"📼 Recorded {sum(self.counts.values())} calls to {self.record_dir}: {dict(self.counts)}")
+
+
+class ReplayProvider:
+    """
+    Serves recorded responses with configurable latency, jitter, error
+    and throttle rates. Exact call matches win; otherwise the latest
+    recording of the same call minus its time arguments is used.
+    """
+
+    name = "replay"
+
+    def __init__(self, record_dir, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                 throttle_rate=0.0, seed=None):
+        self.record_dir = record_dir
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.counts = Counter()
+
+    def _load(self, method, args, kwargs):
+        for loose in (False, True):
+            path = os.path.join(self.record_dir, f"{call_key(method, args, kwargs, loose)}.pkl")
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    return pickle.load(f)
+        return None
+
+    def _call(self, method, *args, **kwargs):
+        with self.rng_lock:
+            delay = max(self.latency + self.rng.uniform(-self.jitter, self.jitter), 0)
+            roll = self.rng.random()
+        time.sleep(delay)
+        self.counts[method] += 1
+
+        if roll < self.throttle_rate:
+            self.counts["throttled"] += 1
+            raise ThrottledError(f"Injected 429 Too Many Requests for {method}{args}")
+        if roll < self.throttle_rate + self.error_rate:
+            self.counts["errors"] += 1
+            raise ProviderError(f"Injected failure for {method}{args}")
+
+        entry = self._load(method, args, kwargs)
+        if entry is None:
+            self.counts["misses"] += 1
+            raise ProviderError(f"No recording for {method}{args} {kwargs}")
+        if entry["error"]:
+            error_cls = ThrottledError if entry.get("throttled") else ProviderError
+            raise error_cls(f"Recorded failure: {entry['error']}")
+        result = entry["result"]
+        return result.copy() if hasattr(result, "copy") else result
+
+    def history(self, symbol, **kwargs):
+        return self._call("history", symbol, **kwargs)
+
+    def download(self, tickers, **kwargs):
+        return self._call("download", tickers, **kwargs)
+
+    def info(self, symbol):
+        return self._call("info", symbol)
+
+    def tv_hist(self, symbol, **kwargs):
+        return self._call("tv_hist", symbol, **kwargs)
+
+    def report(self):
+        print(f"📼 Replayed from {self.record_dir}: {dict(self.counts)}")
+
+
+class RateLimitedProvider:
+    """
+    Paces every call through its source's limiter, fails fast while the
+    source's breaker is open, and reports each outcome back to both.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.name = inner.name
+
+    def _call(self, method, cost, *args, **kwargs):
+        source = METHOD_SOURCES[method]
+        breaker = get_breaker(source)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{source} circuit open; skipped {method}{args}")
+        limiter = get_limiter(source)
+        limiter.acquire(cost)
+        try:
+            result = getattr(self.inner, method)(*args, **kwargs)
+        except Exception as e:
+            limiter.record(e)
+            breaker.record(False)
+            if is_throttle_error(e) and not isinstance(e, ThrottledError):
+                raise ThrottledError(str(e)) from e
+            raise
+        limiter.record()
+        breaker.record(True)
+        return result
+
+    def history(self, symbol, **kwargs):
+        return self._call("history", 1, symbol, **kwargs)
+
+    def download(self, tickers, **kwargs):
+        count = 1 if isinstance(tickers, str) else len(tickers)
+        return self._call("download", max(1.0, count * DOWNLOAD_COST_PER_TICKER), tickers, **kwargs)
+
+    def info(self, symbol):
+        return self._call("info", 1, symbol)
+
+    def tv_hist(self, symbol, **kwargs):
+        return self._call("tv_hist", 1, symbol, **kwargs)
+
+    def report(self):
+        if hasattr(self.inner, "report"):
+            self.inner.report()
+        for source in sorted(set(METHOD_SOURCES.values())):
+            status = get_limiter(source).status()
+            print(f"🚦 {source}: {status['rate']}/s, {status['calls']} calls, "
+                  f"{status['errors']} errors, {status['throttled']} throttled")
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    """Process-wide provider, built once from MARKET_DATA_* env vars."""
+    global _provider
+    with _provider_lock:
+        if _provider is not None:
+            return _provider
+
+        mode = os.getenv("MARKET_DATA_MODE", "live").lower()
+        record_dir = os.getenv("MARKET_DATA_DIR", DEFAULT_RECORD_DIR)
+        if mode == "record":
+            _provider = RecordingProvider(LiveProvider(), record_dir)
+        elif mode == "replay":
+            seed = os.getenv("REPLAY_SEED")
+            _provider = ReplayProvider(
+                record_dir,
+                latency_ms=float(os.getenv("REPLAY_LATENCY_MS", "0")),
+                jitter_ms=float(os.getenv("REPLAY_JITTER_MS", "0")),
+                error_rate=float(os.getenv("REPLAY_ERROR_RATE", "0")),
+                throttle_rate=float(os.getenv("REPLAY_THROTTLE_RATE", "0")),
+                seed=int(seed) if seed is not None else None,
+            )
+        else:
+            _provider = LiveProvider()
+
+        _provider = RateLimitedProvider(_provider)
+        atexit.register(_provider.report)
+        return _provider
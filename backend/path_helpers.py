@@ -1,13 +1,11 @@
 import os
-import glob
+from backend import cache_manifest
 
-def get_latest_universe_path(cache_dir: str = "backend/cache") -> str | None:
-    pattern = os.path.join(cache_dir, "universe_enriched_*.json")
-    files = glob.glob(pattern)
-    if not files:
+def get_latest_universe_path() -> str | None:
+    latest = cache_manifest.latest("universe_enriched")
+    if latest is None:
         print("❌ No universe enriched cache files found.")
         return None
-    latest = max(files, key=os.path.getmtime)
     print(f"✅ Latest universe file found: {latest}")
     return latest
 
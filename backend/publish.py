@@ -0,0 +1,66 @@
+# backend/publish.py
+"""
+Atomic publishing of cache artifacts.
+
+Every producer writes through publish_json()/publish_bytes(): the bytes go
+to a temp file under backend/cache/.publish, are fsync'd, and the temp
+file is renamed over the final path. A reader that opens the path gets
+either the previous file or the new one, never a torn write, and the
+watchdog sees a single event per publish instead of a stream of
+on_modified events while the file grows.
+
+With a `kind`, the artifact is recorded in the cache manifest and its
+generation number for that kind is bumped, so readers can cache by
+generation instead of re-checking the file.
+"""
+import os
+import threading
+
+from backend import serialization
+from backend import cache_manifest
+
+# Same filesystem as the cache (rename must not cross devices); a
+# subdirectory so the non-recursive watchdog never sees temp files
+TMP_DIR = os.path.join(cache_manifest.CACHE_DIR, ".publish")
+
+
+def _fsync_dir(path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass  # not supported everywhere (e.g. Windows); the rename is still atomic
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, body):
+    """Write `body` to `path` via temp file + fsync + rename."""
+    os.makedirs(TMP_DIR, exist_ok=True)
+    tmp_path = os.path.join(TMP_DIR, f"{os.path.basename(path)}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_dir(os.path.dirname(os.path.abspath(path)))
+
+
+def publish_bytes(path, body, kind=None, date=None):
+    """Atomically publish `body` at `path`; returns the manifest entry when `kind` is given."""
+    atomic_write(path, body)
+    if kind:
+        return cache_manifest.record(kind, path, date=date, body=body)
+    return None
+
+
+def publish_json(path, data, kind=None, date=None, pretty=False):
+    return publish_bytes(path, serialization.dumps(data, pretty=pretty), kind=kind, date=date)
@@ -0,0 +1,231 @@
+# backend/rate_limiter.py
+"""
+Adaptive token-bucket rate limiter, one bucket per upstream source.
+
+Bucket state lives in backend/cache/store/ratelimits/<source>.json and is
+updated under an fcntl lock, so the scheduler jobs, the API process and the
+watchdog all draw from the same budget. Callers reserve tokens up front and
+sleep for their slot, so a negative token count is the shared queue depth.
+
+The rate adapts AIMD-style:
+  429 / throttled  – rate halves and the source cools down (doubling per repeat)
+  error window     – rate is trimmed when >ERROR_RATE_LIMIT of a window failed
+  clean window     – rate climbs back by INCREASE_STEP × max_rate
+"""
+import os
+import json
+import math
+import time
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to per-process buckets
+    fcntl = None
+
+STATE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "cache", "store", "ratelimits"))
+SHARED = os.getenv("RATE_LIMIT_SHARED", "1") == "1" and fcntl is not None
+
+# Requests/second: starting rate, floor, ceiling, burst size
+DEFAULT_LIMITS = {
+    "yfinance": {"rate": 5.0, "min_rate": 0.5, "max_rate": 20.0, "burst": 10},
+    "tradingview": {"rate": 2.0, "min_rate": 0.2, "max_rate": 6.0, "burst": 4},
+}
+
+WINDOW_SIZE = 20            # outcomes per adaptation window
+ERROR_RATE_LIMIT = 0.2      # window error share that triggers a trim
+ERROR_DECREASE = 0.75
+THROTTLE_DECREASE = 0.5
+INCREASE_STEP = 0.05
+BASE_COOLDOWN = 2.0
+MAX_COOLDOWN = 60.0
+
+
+def _status_code(error):
+    for obj in (error, getattr(error, "response", None)):
+        for attr in ("status_code", "status"):
+            code = getattr(obj, attr, None)
+            if isinstance(code, int):
+                return code
+    return None
+
+
+def is_throttle_error(error):
+    """
+    True for HTTP 429 style rejections, whatever library raised them: a 429
+    status on the error or its response, a rate-limit exception type (e.g.
+    yfinance's YFRateLimitError, our ThrottledError) or a "Too Many Requests"
+    message. A bare "429" in the text is not enough; tickers, timestamps
+    and URLs contain it too.
+    """
+    if error is None:
+        return False
+    if _status_code(error) == 429:
+        return True
+    if any("RateLimit" in cls.__name__ or "Throttled" in cls.__name__ for cls in type(error).__mro__):
+        return True
+    return "too many requests" in str(error).lower()
+
+
+def _env_limit(source, key, default):
+    return float(os.getenv(f"RATE_LIMIT_{source.upper()}_{key.upper()}", default))
+
+
+class AdaptiveRateLimiter:
+    def __init__(self, source, rate, min_rate, max_rate, burst):
+        self.source = source
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.start_rate = rate
+        self.path = os.path.join(STATE_DIR, f"{source}.json")
+        self.waiting = 0
+        self._lock = threading.Lock()
+        self._local = None
+        if SHARED:
+            os.makedirs(STATE_DIR, exist_ok=True)
+
+    def _fresh_state(self):
+        return {
+            "source": self.source,
+            "rate": self.start_rate,
+            "tokens": float(self.burst),
+            "updated": time.time(),
+            "blocked_until": 0.0,
+            "consecutive_throttles": 0,
+            "window_calls": 0,
+            "window_errors": 0,
+            "calls": 0,
+            "errors": 0,
+            "throttled": 0,
+        }
+
+    @contextmanager
+    def _state(self):
+        """Read-modify-write of the bucket, exclusive across threads and processes."""
+        with self._lock:
+            if not SHARED:
+                if self._local is None:
+                    self._local = self._fresh_state()
+                yield self._local
+                return
+
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            with os.fdopen(fd, "r+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    raw = f.read()
+                    try:
+                        state = {**self._fresh_state(), **json.loads(raw)} if raw else self._fresh_state()
+                    except ValueError:
+                        state = self._fresh_state()
+                    # Limits come from config; only the learned rate carries over
+                    state["rate"] = min(max(state["rate"], self.min_rate), self.max_rate)
+                    yield state
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps(state))
+                    f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _refill(self, state, now):
+        elapsed = max(now - state["updated"], 0)
+        state["tokens"] = min(state["tokens"] + elapsed * state["rate"], self.burst)
+        state["updated"] = now
+
+    def acquire(self, cost=1.0):
+        """Reserve `cost` tokens and block until they are ours. Returns seconds waited."""
+        with self._state() as state:
+            now = time.time()
+            self._refill(state, now)
+            state["tokens"] -= cost
+            wait = max(-state["tokens"] / state["rate"], 0)
+            wait = max(wait, state["blocked_until"] - now)
+        if wait > 0:
+            with self._lock:
+                self.waiting += 1
+            try:
+                time.sleep(wait)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+        return wait
+
+    def record(self, error=None):
+        """Feed back one call outcome so the rate can adapt."""
+        throttled = is_throttle_error(error)
+        with self._state() as state:
+            now = time.time()
+            self._refill(state, now)
+            state["calls"] += 1
+            state["window_calls"] += 1
+
+            if throttled:
+                state["throttled"] += 1
+                state["consecutive_throttles"] += 1
+                cooldown = min(BASE_COOLDOWN * 2 ** (state["consecutive_throttles"] - 1), MAX_COOLDOWN)
+                state["blocked_until"] = max(state["blocked_until"], now + cooldown)
+                state["rate"] = max(state["rate"] * THROTTLE_DECREASE, self.min_rate)
+                # Queued reservations were sized for the old rate
+                state["tokens"] = min(state["tokens"], 0.0)
+                state["window_calls"] = state["window_errors"] = 0
+                print(f"🐢 {self.source}: throttled, rate → {state['rate']:.2f}/s, cooling down {cooldown:.0f}s")
+                return
+
+            state["consecutive_throttles"] = 0
+            if error is not None:
+                state["errors"] += 1
+                state["window_errors"] += 1
+
+            if state["window_calls"] >= WINDOW_SIZE:
+                error_share = state["window_errors"] / state["window_calls"]
+                if error_share > ERROR_RATE_LIMIT:
+                    state["rate"] = max(state["rate"] * ERROR_DECREASE, self.min_rate)
+                elif state["window_errors"] == 0:
+                    state["rate"] = min(state["rate"] + INCREASE_STEP * self.max_rate, self.max_rate)
+                state["window_calls"] = state["window_errors"] = 0
+
+    def status(self):
+        with self._state() as state:
+            now = time.time()
+            self._refill(state, now)
+            return {
+                "source": self.source,
+                "rate": round(state["rate"], 3),
+                "tokens": round(max(state["tokens"], 0), 2),
+                "queue_depth": math.ceil(max(-state["tokens"], 0)),
+                "waiting_here": self.waiting,
+                "cooldown_remaining": round(max(state["blocked_until"] - now, 0), 1),
+                "calls": state["calls"],
+                "errors": state["errors"],
+                "throttled": state["throttled"],
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(source):
+    """Process-wide limiter for `source`, sharing state with other processes."""
+    with _limiters_lock:
+        if source not in _limiters:
+            defaults = DEFAULT_LIMITS.get(source, DEFAULT_LIMITS["yfinance"])
+            _limiters[source] = AdaptiveRateLimiter(
+                source,
+                rate=_env_limit(source, "rate", defaults["rate"]),
+                min_rate=_env_limit(source, "min_rate", defaults["min_rate"]),
+                max_rate=_env_limit(source, "max_rate", defaults["max_rate"]),
+                burst=_env_limit(source, "burst", defaults["burst"]),
+            )
+        return _limiters[source]
+
+
+def rate_limit_status():
+    """Current state of every known bucket, including ones used by other processes."""
+    sources = set(DEFAULT_LIMITS)
+    if SHARED and os.path.isdir(STATE_DIR):
+        sources |= {f[:-5] for f in os.listdir(STATE_DIR) if f.endswith(".json")}
+    return {source: get_limiter(source).status() for source in sorted(sources)}
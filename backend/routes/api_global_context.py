@@ -1,16 +1,18 @@
 # backend/routes/api_global_context.py
 
-from fastapi import APIRouter
-import os
-import json
+from fastapi import APIRouter, Request
+from backend.signals.fetch_global_context import context_hub
+from backend.snapshot_cache import snapshot_cache
 
 router = APIRouter()
 
 @router.get("/global_context")
-def get_global_context():
-    path = "backend/cache/global_context.json"
-    if not os.path.exists(path):
+def get_global_context(request: Request):
+    # Served from the producer's in-memory snapshot; file is the cold-start fallback
+    if context_hub.latest is not None:
+        return snapshot_cache.encoded_response("global_context", context_hub.latest, request=request)
+    response = snapshot_cache.latest_response("global_context", request)
+    if response is None:
         return {"error": "No context file found."}
-    with open(path, "r") as f:
-        return json.load(f)
+    return response
 
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
-from fastapi.responses import JSONResponse
 from backend.screenbuilder import build_screening_output
+from backend.serialization import FastJSONResponse
 
 router = APIRouter()
 
@@ -8,7 +8,7 @@ router = APIRouter()
 def get_autowatchlist():
     try:
         data = build_screening_output()
-        return JSONResponse(content=data.to_dict("records"))
+        return FastJSONResponse(content=data.to_dict("records"))
     except Exception as e:
         print(f"❌ Error generating autowatchlist: {e}")
-        return JSONResponse(status_code=500, content={"error": "Failed to generate autowatchlist."})
+        return FastJSONResponse(status_code=500, content={"error": "Failed to generate autowatchlist."})
@@ -0,0 +1,34 @@
+# backend/routes/history_router.py
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from backend import history_store
+
+router = APIRouter()
+
+@router.get("/history/dates")
+def get_history_dates(limit: int = 60):
+    return {"dates": history_store.dates(limit)}
+
+@router.get("/history/top")
+def get_top_scored(sessions: int = 30, limit: int = 10):
+    # Top-scored names per session for the last `sessions` ingested days
+    return history_store.top_scored(sessions, limit)
+
+@router.get("/history/signal/{signal}")
+def get_signal_symbols(signal: str, date: str | None = None):
+    if date is None:
+        latest = history_store.dates(1)
+        if not latest:
+            return JSONResponse(status_code=404, content={"error": "History store is empty."})
+        date = latest[0]
+    return {"date": date, "signal": signal, "symbols": history_store.signal_symbols(signal, date)}
+
+@router.get("/history/symbol/{symbol}")
+def get_symbol_history(symbol: str, start: str | None = None, end: str | None = None, full: bool = False):
+    return {"symbol": symbol.upper(), "days": history_store.symbol_history(symbol, start, end, full)}
+
+@router.get("/history/symbol/{symbol}/signal/{signal}")
+def get_symbol_signal_days(symbol: str, signal: str, start: str | None = None, end: str | None = None):
+    # e.g. every day AAPL hit break_above_range
+    return {"symbol": symbol.upper(), "signal": signal, "dates": history_store.signal_days(symbol, signal, start, end)}
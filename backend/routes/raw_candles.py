@@ -1,11 +1,13 @@
 # backend/routes/raw_candles.py
 
 from fastapi import APIRouter, Query, HTTPException
-from fastapi.responses import JSONResponse
 import os
-import json
 from datetime import datetime
 
+from backend.tracker.candle_service import raw_candles_path, load_raw_candles
+from backend.tracker.candle_io import block_to_records
+from backend.serialization import FastJSONResponse
+
 router = APIRouter()
 
 CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'cache')
@@ -16,16 +18,20 @@ def get_raw_candles(
     date: str = Query(default=datetime.now().strftime("%Y-%m-%d"), description="Date in YYYY-MM-DD")
 ):
     symbol = symbol.upper()
-    filename = f"tv_candles_{symbol}_{date}.json"
-    filepath = os.path.join(CACHE_DIR, filename)
+    filepath = raw_candles_path(symbol, date)
+    filename = os.path.basename(filepath)
 
     if not os.path.exists(filepath):
         raise HTTPException(status_code=404, detail=f"Candle file not found: {filename}")
 
-    with open(filepath, "r") as f:
-        try:
-            candles = json.load(f)
-        except json.JSONDecodeError:
-            raise HTTPException(status_code=500, detail=f"Failed to parse {filename}")
+    try:
+        raw = load_raw_candles(filepath)
+    except Exception:
+        raise HTTPException(status_code=500, detail=f"Failed to parse {filename}")
 
-    return JSONResponse(content=candles)
+    # Columnar on disk; expanded to the row-per-candle JSON shape at the edge
+    candles = {
+        key: block_to_records(value, with_timestamp=True) if isinstance(value, dict) else value
+        for key, value in raw.items()
+    }
+    return FastJSONResponse(content=candles)
@@ -1,7 +1,10 @@
-from fastapi import APIRouter
-from fastapi.responses import JSONResponse
-import os, json
+from fastapi import APIRouter, Request
+import os
 from datetime import datetime
+from backend.rate_limiter import rate_limit_status
+from backend import serialization
+from backend.serialization import FastJSONResponse
+from backend.snapshot_cache import Snapshot, snapshot_cache, conditional_response, body_etag
 
 router = APIRouter()
 
@@ -24,23 +27,31 @@ def _read_lock():
         return {"scraping": True, "phase": "running", "process": None}
 
 @router.get("/system-status")
-async def system_status():
+async def system_status(request: Request):
     status = _read_lock()
     # Optional: include watchlist_count for the UI
-    files = [f for f in os.listdir(CACHE_DIR) if f.startswith("autowatchlist_cache") and f.endswith(".json")]
     count = 0
-    if files:
-        files.sort(key=lambda f: os.path.getmtime(os.path.join(CACHE_DIR, f)), reverse=True)
+    snapshot = snapshot_cache.latest("autowatchlist")
+    if snapshot is not None:
         try:
-            with open(os.path.join(CACHE_DIR, files[0]), "r") as f:
-                data = json.load(f)
+            data = snapshot.data
             count = len(data) if isinstance(data, list) else len(data.get("tickers", []))
         except Exception:
             count = 0
 
-    return JSONResponse({
+    # Small payload, so hashing it is cheaper than the transfer a 304 saves
+    body = serialization.dumps({
         "scraping": status["scraping"],
         "phase": status["phase"],
         "process": status["process"],
         "watchlist_count": count,
     })
+    return conditional_response(request, body_etag(body), None, lambda: Snapshot(body))
+
+@router.get("/system-status/diagnostics")
+async def system_diagnostics():
+    # Counters move on every call, so these stay out of the polled status payload
+    return FastJSONResponse({
+        "rate_limits": rate_limit_status(),
+        "snapshot_cache": snapshot_cache.stats(),
+    })
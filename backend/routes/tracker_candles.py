@@ -1,7 +1,11 @@
 from fastapi import APIRouter, Query
 from fastapi.responses import JSONResponse
-import os, json, subprocess
+import os
 from datetime import datetime
+from backend.tracker.run_tracker_chart import run_pipeline
+from backend.tracker.build_tracker_candles import tracker_candles_path, load_tracker_candles
+from backend.tracker.candle_io import COLUMNS, block_to_records
+from backend.serialization import FastJSONResponse
 # import logging
 
 router = APIRouter()
@@ -19,43 +23,36 @@ def get_tracker_candles(
         return JSONResponse(status_code=400, content={"error": "Invalid interval"})
 
     symbol = symbol.upper()
-    path = os.path.join(CACHE_DIR, f"tracker_candles_{symbol}_{date}.json")
-
-    try:
-        if not os.path.exists(path):
-            if cache_only:
-                return JSONResponse(status_code=404, content={"error": "Candle cache not available"})
-            subprocess.run(
-                ["python", "backend/tracker/run_tracker_chart.py", symbol],
-                check=True,
-                capture_output=True
-            )
-        elif not cache_only:
-            subprocess.run(
-                ["python", "backend/tracker/run_tracker_chart.py", symbol],
-                check=True,
-                capture_output=True
-            )
-    except subprocess.CalledProcessError as e:
-        # logging.error(f"[tracker-candles] Subprocess failed for {symbol} ({interval}): {e.stderr.decode().strip()}")
-        return JSONResponse(status_code=500, content={"error": "Error loading chart data."})
-
-    if not os.path.exists(path):
+    path = tracker_candles_path(symbol, date)
+
+    data = None
+    if not cache_only:
+        # Charts for today build in-process from the shared candle service
+        try:
+            if date == datetime.now().strftime("%Y-%m-%d"):
+                data = run_pipeline(symbol)
+        except Exception as e:
+            # logging.error(f"[tracker-candles] Build failed for {symbol} ({interval}): {e}")
+            return JSONResponse(status_code=500, content={"error": "Error loading chart data."})
+    if data is None and not os.path.exists(path):
+        if cache_only:
+            return JSONResponse(status_code=404, content={"error": "Candle cache not available"})
         return JSONResponse(status_code=500, content={"error": "Candle cache missing after build"})
 
     try:
-        with open(path, "r") as f:
-            data = json.load(f)
+        if data is None:
+            data = load_tracker_candles(path)
         interval_block = data.get("intervals", {}).get(interval)
-        if not interval_block or "candles" not in interval_block:
+        if not interval_block or "time" not in interval_block:
             return JSONResponse(status_code=404, content={"error": f"No data for interval '{interval}'"})
 
-        return JSONResponse(content={
+        times = interval_block["time"].tolist()
+        return FastJSONResponse(content={
             "symbol": symbol,
             "interval": interval,
-            "candles": interval_block["candles"],
-            "ema10": interval_block.get("ema10"),
-            "ema50": interval_block.get("ema50")
+            "candles": block_to_records({c: interval_block[c] for c in COLUMNS}),
+            "ema10": [{"time": t, "value": v} for t, v in zip(times, interval_block["ema10"].tolist())],
+            "ema50": [{"time": t, "value": v} for t, v in zip(times, interval_block["ema50"].tolist())],
         })
 
     except Exception as e:
@@ -1,5 +1,6 @@
 import os
 import sys
+import json
 import time
 import subprocess
 import argparse
@@ -11,6 +12,9 @@ import logging
 from logging.handlers import RotatingFileHandler
 from tqdm import tqdm
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from backend.signals.fundamentals_cache import needs_refresh, get_latest_universe_symbols
+
 # --- Logging Setup with Rotation ---
 LOG_PATH = os.path.join(os.path.dirname(__file__), "logs", "scheduler.log")
 os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
@@ -47,6 +51,8 @@ def _clear_lock():
 SCRIPTS = {
     "Cache Manager": os.path.join(BASE_DIR, "cache_manager.py"),
     "Universe Builder": os.path.join(BASE_DIR, "signals", "universe_builder.py"),
+    "Fundamentals Refresh": os.path.join(BASE_DIR, "signals", "fundamentals_cache.py"),
+    "Daily History": os.path.join(BASE_DIR, "signals", "daily_store.py"),
     "Post Open Signals": os.path.join(BASE_DIR, "signals", "post_open_signals.py"),
     "945 Signals": os.path.join(BASE_DIR, "signals", "945_signals.py"),
     "Enrich Watchdog": os.path.join(BASE_DIR, "signals", "enrich_watchdog.py"),
@@ -100,6 +106,23 @@ def launch_enrich_watchdog():
         logging.error(f"🐺 Enrich WatchDog failed to start: {e}")
 
 # --- Run Backfills If Missed ---
+def _output_complete(path, job, date_str):
+    """
+    True once `job` has written its final output for the day. A partial
+    publish, or a checkpoint stream still on disk, means the run died before
+    finishing and should be restarted (it resumes from the checkpoint).
+    """
+    if not os.path.exists(path):
+        return False
+    if os.path.exists(os.path.join(CACHE_DIR, "checkpoints", f"{job}_{date_str}.jsonl")):
+        return False
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return not (isinstance(data, dict) and data.get("partial"))
+
 def check_and_run_backfills():
     logging.info("🔁 Checking for missed jobs...")
     tz = timezone("US/Eastern")
@@ -129,11 +152,11 @@ def check_and_run_backfills():
     pos_path = os.path.join(CACHE_DIR, f"post_open_signals_{today_str}.json")
     logging.info(f"🕓 Post-Open cutoff at {pos_cutoff.time()}, now: {now.time()}")
     if pos_cutoff <= now <= market_close:
-        if not os.path.exists(pos_path):
-            logging.info("🔁 Backfilling Post-Open Signals now...")
+        if not _output_complete(pos_path, "post_open_signals", today_str):
+            logging.info("🔁 Backfilling Post-Open Signals now (missing or partial output)...")
             run_script(SCRIPTS["Post Open Signals"], "Post Open Signals")
         else:
-            logging.info("✅ Post-Open file exists, skipping backfill.")
+            logging.info("✅ Post-Open file complete, skipping backfill.")
     else:
         logging.info("⏳ Outside Post-Open window; skipping backfill.")
 
@@ -143,18 +166,33 @@ def check_and_run_backfills():
     s945_path = os.path.join(CACHE_DIR, f"945_signals_{today_str}.json")
     logging.info(f"🕓 945 cutoff at {s945_cutoff.time()}, now: {now.time()}")
     if s945_cutoff <= now <= market_close:
-        if not os.path.exists(s945_path):
-            logging.info("🔁 Backfilling 945 Signals now...")
+        if not _output_complete(s945_path, "945_signals", today_str):
+            logging.info("🔁 Backfilling 945 Signals now (missing or partial output)...")
             run_script(SCRIPTS["945 Signals"], "945 Signals")
         else:
-            logging.info("✅ 945 file exists, skipping backfill.")
+            logging.info("✅ 945 file complete, skipping backfill.")
     else:
         logging.info("⏳ Outside 945 window; skipping backfill.")
 
+    # Fundamentals Refresh — last, so a late restart never delays the time-critical jobs above
+    now = datetime.now(tz)
+    fund_cutoff = tz.localize(datetime.combine(today, dt_time(6, 0)))
+    if now >= fund_cutoff:
+        try:
+            stale = needs_refresh(get_latest_universe_symbols())
+        except Exception as e:
+            logging.info(f"⚠️ Could not check fundamentals cache: {e}")
+            stale = False
+        if stale:
+            logging.info("🔁 Backfilling Fundamentals Refresh now (store missing or mostly stale)...")
+            run_script(SCRIPTS["Fundamentals Refresh"], "Fundamentals Refresh")
+        else:
+            logging.info("✅ Fundamentals cache current, skipping backfill.")
+
 # --- Force Run ---
 def force_run_all():
     logging.info("🏃‍♂️ Forcing execution of all scripts now...")
-    for name in ["Cache Manager", "Universe Builder", "Post Open Signals", "945 Signals"]:
+    for name in ["Cache Manager", "Universe Builder", "Fundamentals Refresh", "Daily History", "Post Open Signals", "945 Signals"]:
         logging.info(f"🔧 Forcing {name}...")
         run_script(SCRIPTS[name], name)
 
@@ -163,6 +201,8 @@ def schedule_jobs():
     logging.info("⏲️ Scheduling daily jobs now")
     scheduler.add_job(lambda: market_day_wrapper("Cache Manager"), trigger="cron", hour=4, minute=0)
     scheduler.add_job(lambda: market_day_wrapper("Universe Builder"), trigger="cron", hour=5, minute=0)
+    scheduler.add_job(lambda: market_day_wrapper("Fundamentals Refresh"), trigger="cron", hour=6, minute=0)
+    scheduler.add_job(lambda: market_day_wrapper("Daily History"), trigger="cron", hour=6, minute=15)
     scheduler.add_job(lambda: market_day_wrapper("Post Open Signals"), trigger="cron", hour=9, minute=35, second=50)
     scheduler.add_job(lambda: market_day_wrapper("945 Signals"), trigger="cron", hour=9, minute=45, second=50)
     scheduler.start()
@@ -1,22 +1,23 @@
-import json
 import os
+import sys
 from datetime import datetime
 import pytz
 from tqdm import tqdm
 from tooltip_builder import build_tooltip  # 👈 NEW IMPORT
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from backend import serialization
+from backend import cache_manifest
+from backend.publish import publish_json
+from backend import history_store
+
 CACHE_DIR = "backend/cache"
 
 def get_latest_universe_file():
-    files = [
-        os.path.join(CACHE_DIR, f)
-        for f in os.listdir(CACHE_DIR)
-        if f.startswith("universe_enriched_") and f.endswith(".json") and not f.endswith("_scored.json")
-    ]
-    if not files:
+    path = cache_manifest.latest("universe_enriched")
+    if path is None:
         raise FileNotFoundError("No enriched universe files found.")
-    files.sort(key=os.path.getmtime, reverse=True)
-    return files[0]
+    return path
 
 UNIVERSE_PATH = get_latest_universe_file()
 current_date_str = datetime.now(pytz.timezone("America/New_York")).strftime("%Y-%m-%d")
@@ -56,8 +57,7 @@ RISK_FLAGS = {
 def load_json(path):
     if not os.path.exists(path):
         return {}
-    with open(path, "r") as f:
-        return json.load(f)
+    return serialization.load(path)
 
 def score(info):
     signals = info.get("signals", {})
@@ -133,9 +133,9 @@ def main():
             "signals": stock.get("signals", {})
         }
 
-    with open(OUTPUT_PATH, "w") as f:
-        json.dump(filtered, f, indent=2)
+    publish_json(OUTPUT_PATH, filtered, kind="universe_scored")
     print(f"✅ Scored universe saved to {OUTPUT_PATH}")
+    history_store.ingest_latest(["universe_scored"])
 
 if __name__ == "__main__":
     main()
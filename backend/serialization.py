@@ -0,0 +1,66 @@
+# backend/serialization.py
+"""
+One JSON codec for every cache writer and API response.
+
+orjson when it is installed (several times faster, handles numpy and
+datetime natively), stdlib json otherwise. Machine-read files are written
+compact.
+"""
+import json
+import numpy as np
+from datetime import datetime, date
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MEDIA_TYPE = "application/json"
+
+
+def _default(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj, pretty=False) -> bytes:
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+    if pretty:
+        return json.dumps(obj, indent=2, default=_default).encode()
+    return json.dumps(obj, separators=(",", ":"), default=_default).encode()
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def dump(obj, path, pretty=False):
+    with open(path, "wb") as f:
+        f.write(dumps(obj, pretty=pretty))
+
+
+class FastJSONResponse(Response):
+    """JSONResponse drop-in that encodes through dumps()."""
+
+    media_type = MEDIA_TYPE
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
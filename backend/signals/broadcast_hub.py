@@ -0,0 +1,108 @@
+# backend/signals/broadcast_hub.py
+
+import asyncio
+import traceback
+
+# Keys that change on every run and should not by themselves count as a change
+VOLATILE_KEYS = ("timestamp", "_timestamp")
+
+
+def diff_snapshot(previous, current):
+    """
+    Top-level keys of `current` whose values differ from `previous`.
+    Returns {} when only volatile keys (timestamps) moved.
+    """
+    if previous is None:
+        return dict(current)
+    changed = {
+        k: v for k, v in current.items()
+        if k not in VOLATILE_KEYS and previous.get(k) != v
+    }
+    if not changed:
+        return {}
+    for k in VOLATILE_KEYS:
+        if k in current:
+            changed[k] = current[k]
+    return changed
+
+
+class SnapshotHub:
+    """
+    Single producer, many subscribers.
+
+    One background task calls `producer()` off the event loop every
+    `interval` seconds, keeps the latest snapshot in memory and fans out
+    only the changed top-level keys to every subscriber queue. New
+    subscribers are primed with the full snapshot. When `active` is given
+    and returns False (e.g. market closed) the tick is skipped.
+    """
+
+    def __init__(self, name, producer, interval, on_snapshot=None, active=None, queue_size=16):
+        self.name = name
+        self.producer = producer
+        self.interval = interval
+        self.on_snapshot = on_snapshot
+        self.active = active
+        self.queue_size = queue_size
+        self.latest = None
+        self.subscribers = set()
+        self._task = None
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            print(f"📡 {self.name} producer started (every {self.interval}s)")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        if self.latest is not None:
+            queue.put_nowait(self.latest)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def _publish(self, message):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow consumer: drop its backlog and resync with a full snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self.latest)
+
+    async def refresh(self):
+        snapshot = await asyncio.to_thread(self.producer)
+        delta = diff_snapshot(self.latest, snapshot)
+        self.latest = snapshot
+        if self.on_snapshot:
+            try:
+                await asyncio.to_thread(self.on_snapshot, snapshot)
+            except Exception as e:
+                print(f"❌ {self.name} snapshot hook failed: {e}")
+        if delta:
+            self._publish(delta)
+        return snapshot
+
+    async def _run(self):
+        while True:
+            try:
+                if self.active is None or self.active():
+                    await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ {self.name} producer failed: {e}")
+                traceback.print_exc()
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,84 @@
+## checkpoint.py
+import os
+import sys
+import threading
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from backend import serialization
+from backend.publish import publish_json
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "cache")
+# Kept out of the top-level cache dir so the enrich watchdog never sees the raw stream
+CHECKPOINT_DIR = os.path.join(CACHE_DIR, "checkpoints")
+
+
+class Checkpoint:
+    """
+    Append-only JSONL stream of per-symbol results for one job run:
+    one {"symbol": ..., "data": ...} object per line. A restart reads the
+    file back and only fetches what is missing. A torn last line from a
+    crash is skipped on load.
+    """
+
+    def __init__(self, job, date_str):
+        os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+        self.path = os.path.join(CHECKPOINT_DIR, f"{job}_{date_str}.jsonl")
+        self._lock = threading.Lock()
+        self._file = None
+
+    def load(self):
+        done = {}
+        if not os.path.exists(self.path):
+            return done
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    entry = serialization.loads(line)
+                    done[entry["symbol"]] = entry["data"]
+                except (ValueError, KeyError):
+                    continue
+        return done
+
+    def append(self, symbol, data):
+        line = serialization.dumps({"symbol": symbol, "data": data})
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "ab+")
+                # Terminate a torn line left by a crash so it doesn't swallow this one
+                if self._file.tell() > 0:
+                    self._file.seek(-1, os.SEEK_END)
+                    if self._file.read(1) != b"\n":
+                        self._file.write(b"\n")
+            self._file.write(line + b"\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def discard(self):
+        """Drop the stream once the final output is written; the next run starts fresh."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class PartialPublisher:
+    """Republishes a job's output at most every `interval` seconds while it is still running."""
+
+    def __init__(self, path, interval, kind=None):
+        self.path = path
+        self.interval = interval
+        self.kind = kind
+        self.last = datetime.now()
+
+    def maybe_publish(self, build_output, force=False):
+        now = datetime.now()
+        if not force and (now - self.last).total_seconds() < self.interval:
+            return False
+        publish_json(self.path, build_output(), kind=self.kind)
+        self.last = now
+        return True
@@ -0,0 +1,266 @@
+## daily_store.py
+import io
+import os
+import sys
+import warnings
+import numpy as np
+import pandas as pd
+import pandas_market_calendars as mcal
+from datetime import datetime, timedelta
+from pytz import timezone
+from tqdm import tqdm
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from backend.signals.metadata_store import STORE_DIR
+from backend.signals.fundamentals_cache import get_latest_universe_symbols
+from backend.market_data import get_provider
+from backend.publish import publish_bytes
+
+STORE_PATH = os.path.join(STORE_DIR, "daily_ohlcv.npz")
+EASTERN = timezone("US/Eastern")
+
+FIELDS = ["open", "high", "low", "close", "volume"]
+MAX_DAYS = int(os.getenv("DAILY_STORE_MAX_DAYS", "60"))
+BACKFILL_PERIOD = "3mo"
+CHUNK_SIZE = 100
+# Daily bars are treated as final this long after the session close
+SETTLE_DELAY = timedelta(minutes=15)
+
+
+class DailyStore:
+    """
+    Completed daily OHLCV bars for the whole universe as dense
+    symbols × days float arrays (NaN where a symbol has no bar).
+
+    `checked` maps symbols whose last fetch returned no new bars to the
+    cutoff it was made for, so delisted or halted names are not
+    re-downloaded until the next session completes.
+    """
+
+    def __init__(self, symbols=None, dates=None, fields=None, checked=None):
+        self.symbols = list(symbols or [])
+        self.dates = np.asarray(dates if dates is not None else [], dtype="datetime64[D]")
+        shape = (len(self.symbols), len(self.dates))
+        self.fields = fields or {f: np.full(shape, np.nan) for f in FIELDS}
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        self.checked = checked if checked is not None else {}
+
+    @classmethod
+    def load(cls, path=STORE_PATH):
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with np.load(path) as data:
+                checked = {}
+                if "checked_symbols" in data:  # absent in stores saved before it was tracked
+                    checked = dict(zip(data["checked_symbols"].tolist(), data["checked_dates"]))
+                return cls(
+                    symbols=data["symbols"].tolist(),
+                    dates=data["dates"],
+                    fields={f: data[f] for f in FIELDS},
+                    checked=checked,
+                )
+        except Exception as e:
+            print(f"⚠️ Could not read daily store {path}: {e}")
+            return cls()
+
+    def save(self, path=STORE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        buf = io.BytesIO()
+        np.savez(
+            buf,
+            symbols=np.array(self.symbols),
+            dates=self.dates,
+            checked_symbols=np.array(list(self.checked), dtype=str),
+            checked_dates=np.array(list(self.checked.values()), dtype="datetime64[D]"),
+            **self.fields,
+        )
+        date = str(self.dates[-1]) if len(self.dates) else None
+        publish_bytes(path, buf.getvalue(), kind="daily_store", date=date)
+
+    def last_date(self, symbol):
+        """Most recent date with a close for `symbol`, or None."""
+        i = self.index.get(symbol)
+        if i is None:
+            return None
+        valid = np.flatnonzero(~np.isnan(self.fields["close"][i]))
+        return self.dates[valid[-1]] if len(valid) else None
+
+    def merge(self, bars):
+        """
+        Merge {symbol: {date: (o, h, l, c, v)}} into the arrays, keeping
+        only the newest MAX_DAYS columns.
+        """
+        bars = {
+            symbol: {np.datetime64(d, "D").item(): values for d, values in rows.items()}
+            for symbol, rows in bars.items()
+        }
+        new_symbols = [s for s in bars if s not in self.index]
+        new_dates = {d for rows in bars.values() for d in rows}
+        symbols = self.symbols + new_symbols
+        dates = np.array(sorted(set(self.dates.tolist()) | new_dates), dtype="datetime64[D]")[-MAX_DAYS:]
+
+        date_pos = {d: j for j, d in enumerate(dates.tolist())}
+        old_cols = [date_pos.get(d) for d in self.dates.tolist()]
+        fields = {}
+        for f in FIELDS:
+            arr = np.full((len(symbols), len(dates)), np.nan)
+            for j_old, j_new in enumerate(old_cols):
+                if j_new is not None:
+                    arr[:len(self.symbols), j_new] = self.fields[f][:, j_old]
+            fields[f] = arr
+
+        sym_pos = {s: i for i, s in enumerate(symbols)}
+        for symbol, rows in bars.items():
+            i = sym_pos[symbol]
+            for d, values in rows.items():
+                j = date_pos.get(d)
+                if j is None:
+                    continue
+                for f, v in zip(FIELDS, values):
+                    fields[f][i, j] = v
+
+        self.__init__(symbols, dates, fields, self.checked)
+
+    def lookback_stats(self, symbols, lookback=10):
+        """
+        Vectorized 10-day statistics for every requested symbol at once:
+        avg_vol_10d, hi_10d, lo_10d, pd_hi, pd_lo, prev_close.
+        """
+        rows = [self.index.get(s) for s in symbols]
+        present = [(s, i) for s, i in zip(symbols, rows) if i is not None]
+        if not present or not len(self.dates):
+            return {}
+        idx = np.array([i for _, i in present])
+
+        window = slice(max(len(self.dates) - lookback, 0), None)
+        vol = self.fields["volume"][idx, window]
+        high = self.fields["high"][idx, window]
+        low = self.fields["low"][idx, window]
+        valid_days = np.sum(~np.isnan(vol), axis=1)
+
+        with warnings.catch_warnings():
+            # All-NaN rows (no bars in the window) are expected for thin symbols
+            warnings.simplefilter("ignore", RuntimeWarning)
+            avg_vol = np.nanmean(vol, axis=1)
+            hi = np.nanmax(high, axis=1)
+            lo = np.nanmin(low, axis=1)
+
+        last_col = np.array([self._last_valid_col(i) for i in idx])
+        stats = {}
+        for k, (symbol, i) in enumerate(present):
+            j = last_col[k]
+            if j < 0:
+                continue
+            entry = {
+                "pd_hi": round(float(self.fields["high"][i, j]), 2),
+                "pd_lo": round(float(self.fields["low"][i, j]), 2),
+                "prev_close": round(float(self.fields["close"][i, j]), 4),
+            }
+            if not np.isnan(hi[k]):
+                entry["hi_10d"] = round(float(hi[k]), 2)
+                entry["lo_10d"] = round(float(lo[k]), 2)
+            # Same bar-count guard the per-ticker path used before relying on the average
+            if valid_days[k] >= lookback - 1 and avg_vol[k] > 0:
+                entry["avg_vol_10d"] = float(avg_vol[k])
+            stats[symbol] = entry
+        return stats
+
+    def _last_valid_col(self, i):
+        valid = np.flatnonzero(~np.isnan(self.fields["close"][i]))
+        return int(valid[-1]) if len(valid) else -1
+
+
+def completed_cutoff(now=None):
+    """Latest XNYS session date whose daily bar is final (weekends, holidays and early closes aware)."""
+    now = now or datetime.now(EASTERN)
+    nyse = mcal.get_calendar("XNYS")
+    schedule = nyse.schedule(start_date=now.date() - timedelta(days=10), end_date=now.date())
+    settled = schedule[schedule["market_close"] + SETTLE_DELAY <= pd.Timestamp(now)]
+    if settled.empty:
+        return np.datetime64(now.date() - timedelta(days=1), "D")
+    return np.datetime64(settled.index[-1].date(), "D")
+
+
+def _download_chunk(symbols, cutoff, **kwargs):
+    yf_symbols = {s.replace(".", "-"): s for s in symbols}
+    frame = get_provider().download(list(yf_symbols), interval="1d", group_by="ticker",
+                        auto_adjust=False, progress=False, threads=True, **kwargs)
+    bars = {}
+    if frame is None or frame.empty:
+        return bars
+    for yf_symbol, symbol in yf_symbols.items():
+        if yf_symbol not in frame.columns.get_level_values(0):
+            continue
+        df = frame[yf_symbol].dropna(subset=["Close"])
+        rows = {}
+        for ts, row in df.iterrows():
+            d = np.datetime64(ts.date(), "D")
+            if d <= cutoff:
+                rows[d] = (row["Open"], row["High"], row["Low"], row["Close"], row["Volume"])
+        if rows:
+            bars[symbol] = rows
+    return bars
+
+
+def update_daily_store(symbols, store=None):
+    """
+    Backfill symbols the store has never seen and extend the rest up to
+    the last completed session. Already-current symbols, and symbols that
+    came back empty for this cutoff, cost nothing.
+    """
+    store = store or DailyStore.load()
+    cutoff = completed_cutoff()
+
+    backfill, extend = [], {}
+    for symbol in symbols:
+        last = store.last_date(symbol)
+        checked = store.checked.get(symbol)
+        if checked is not None and checked >= cutoff:
+            continue
+        if last is None:
+            backfill.append(symbol)
+        elif last < cutoff:
+            extend.setdefault(last, []).append(symbol)
+
+    if not backfill and not extend:
+        print(f"✅ Daily store current through {cutoff} for {len(symbols)} tickers")
+        return store
+
+    print(f"📚 Daily store: backfilling {len(backfill)}, extending {sum(map(len, extend.values()))} tickers")
+    bars = {}
+    jobs = [(backfill, {"period": BACKFILL_PERIOD})]
+    for last, group in extend.items():
+        start = (last + np.timedelta64(1, "D")).astype(datetime)
+        jobs.append((group, {"start": start.strftime("%Y-%m-%d")}))
+
+    empty = []
+    for group, kwargs in jobs:
+        chunks = [group[i:i + CHUNK_SIZE] for i in range(0, len(group), CHUNK_SIZE)]
+        for chunk in tqdm(chunks, desc="📚 Daily bars"):
+            try:
+                fetched = _download_chunk(chunk, cutoff, **kwargs)
+            except Exception as e:
+                tqdm.write(f"⚠️ Daily chunk of {len(chunk)} failed: {e}")
+                continue
+            bars.update(fetched)
+            # Failed chunks are retried next run; empty answers wait for the next session
+            empty.extend(s for s in chunk if s not in fetched)
+
+    for symbol in empty:
+        store.checked[symbol] = cutoff
+    for symbol in bars:
+        store.checked.pop(symbol, None)
+    if empty:
+        print(f"⏭️ {len(empty)} tickers returned no new bars — skipped until after {cutoff}")
+
+    if bars or empty:
+        if bars:
+            store.merge(bars)
+        store.save()
+    print(f"✅ Daily store saved: {len(store.symbols)} tickers × {len(store.dates)} days")
+    return store
+
+
+if __name__ == "__main__":
+    update_daily_store(get_latest_universe_symbols())
@@ -1,6 +1,7 @@
 ## enrich_watchdog.py
 import os
 import time
+import threading
 import subprocess
 from datetime import datetime
 from watchdog.observers import Observer
@@ -17,9 +18,12 @@ TRIGGER_FILES = [
     "short_interest.json",
     "multi_day_levels.json"
 ]
-COOLDOWN_SECONDS = 120  # Avoid re-triggering too frequently
+# Producers republish partial output every few seconds while they run; let a
+# burst of publishes settle, then run once. Publishes that land while the
+# pipeline is running are coalesced into a single trailing run.
+DEBOUNCE_SECONDS = 3
 
-last_triggered = {}
+pipeline_requested = threading.Event()
 
 
 def run_pipeline():
@@ -45,26 +49,49 @@ def initial_check_and_trigger():
                 return
 
 
+def pipeline_worker():
+    while True:
+        pipeline_requested.wait()
+        time.sleep(DEBOUNCE_SECONDS)
+        # Clear before running: anything that lands during the run schedules one more pass
+        pipeline_requested.clear()
+        run_pipeline()
+
+
 class CacheUpdateHandler(FileSystemEventHandler):
-    def on_modified(self, event):
-        if event.is_directory:
+    """
+    Producers publish by renaming a finished temp file into place
+    (backend/publish.py), so a complete output arrives as one created/moved
+    event. In-place modifications are ignored: they only ever mean a write
+    still in progress.
+    """
+
+    def _handle(self, path):
+        filename = os.path.basename(path)
+        if filename.startswith(".") or filename.endswith(".tmp"):
             return
-        filename = os.path.basename(event.src_path)
         for trigger in TRIGGER_FILES:
             if trigger in filename:
-                now = time.time()
-                last = last_triggered.get(trigger, 0)
-                if now - last > COOLDOWN_SECONDS:
-                    print(f"🕵️ Detected update '{filename}' — running full pipeline...")
-                    run_pipeline()
-                    last_triggered[trigger] = now
+                if pipeline_requested.is_set():
+                    print(f"⏱️ Coalescing update '{filename}' into the pending run")
                 else:
-                    print(f"⏱️ Skipping duplicate trigger for '{filename}'")
+                    print(f"🕵️ Detected update '{filename}' — queueing full pipeline...")
+                    pipeline_requested.set()
                 break
 
+    def on_created(self, event):
+        # Renamed in from backend/cache/.publish, outside the watched level
+        if not event.is_directory:
+            self._handle(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._handle(event.dest_path)
+
 
 if __name__ == "__main__":
     initial_check_and_trigger()
+    threading.Thread(target=pipeline_worker, daemon=True).start()
     observer = Observer()
     handler = CacheUpdateHandler()
     observer.schedule(handler, path=WATCH_DIR, recursive=False)
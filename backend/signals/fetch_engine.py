@@ -0,0 +1,153 @@
+## fetch_engine.py
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from contextlib import contextmanager
+from datetime import datetime
+from pytz import timezone
+from tqdm import tqdm
+
+EASTERN = timezone("US/Eastern")
+
+# universe_builder levels: anchors, then Dow + sector ETFs, then everything else
+LEVEL_PRIORITY = {"L0": 0, "L1": 1, "L2": 2}
+
+
+class PhaseTimer:
+    """
+    Collects wall-clock durations for the named phases of a job run.
+    Use `with timer.phase("name"):` around each step, then `timer.report()`.
+    """
+
+    def __init__(self):
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round(time.perf_counter() - start, 2)
+
+    def summary(self):
+        """Phases recorded so far plus their total, without printing."""
+        return dict(self.phases, total=round(sum(self.phases.values()), 2))
+
+    def report(self):
+        summary = self.summary()
+        print("⏱️ Phase timings:")
+        for name, seconds in summary.items():
+            print(f"   • {name:<20} {seconds:>8.2f}s")
+        return summary
+
+
+class Deadline:
+    """
+    Wall-clock publish deadline ("HH:MM[:SS]" US/Eastern, today). A deadline
+    that has already passed when the job starts is ignored, so late
+    backfill runs still complete.
+    """
+
+    def __init__(self, hhmmss=None, now=None):
+        self.at = None
+        if not hhmmss:
+            return
+        now = now or datetime.now(EASTERN)
+        fmt = "%H:%M:%S" if hhmmss.count(":") == 2 else "%H:%M"
+        at = EASTERN.localize(datetime.combine(now.date(), datetime.strptime(hhmmss, fmt).time()))
+        if at <= now:
+            print(f"⏰ Deadline {hhmmss} already passed — running without one")
+            return
+        self.at = at
+
+    def remaining(self):
+        if self.at is None:
+            return None
+        return max((self.at - datetime.now(EASTERN)).total_seconds(), 0)
+
+    def expired(self):
+        return self.at is not None and self.remaining() <= 0
+
+    def __str__(self):
+        return self.at.strftime("%H:%M:%S") if self.at else "none"
+
+
+def order_by_level(universe):
+    """Universe symbols with L0 first, then L1, then L2; universe order within a level."""
+    return sorted(universe, key=lambda s: LEVEL_PRIORITY.get(universe[s].get("level"), len(LEVEL_PRIORITY)))
+
+
+def coverage_report(universe, fetched, deadline=None):
+    """Per-level fetched/total counts, plus any L0 names that missed the cut."""
+    report = {}
+    for level in list(LEVEL_PRIORITY) + ["other"]:
+        names = [
+            s for s, meta in universe.items()
+            if (meta.get("level") if meta.get("level") in LEVEL_PRIORITY else "other") == level
+        ]
+        if not names:
+            continue
+        got = sum(1 for s in names if s in fetched)
+        report[level] = {"fetched": got, "total": len(names), "pct": round(got / len(names) * 100, 1)}
+
+    report["missing_L0"] = [s for s, meta in universe.items() if meta.get("level") == "L0" and s not in fetched]
+    report["deadline"] = str(deadline) if deadline else "none"
+    report["deadline_hit"] = bool(deadline and deadline.expired())
+
+    print("🎯 Coverage:")
+    for level in list(LEVEL_PRIORITY) + ["other"]:
+        if level in report:
+            r = report[level]
+            print(f"   • {level:<6} {r['fetched']:>4}/{r['total']:<4} ({r['pct']}%)")
+    if report["missing_L0"]:
+        print(f"   ⚠️ Missing L0: {', '.join(report['missing_L0'])}")
+    return report
+
+
+def run_concurrent(symbols, fetch_fn, workers=8, desc="🔄 Fetching", deadline=None, on_result=None):
+    """
+    Run fetch_fn(symbol) for every symbol on a bounded thread pool, in the
+    given order. Returns {symbol: result} for every call that returned a
+    truthy result; fetch_fn keeps ownership of its own retry/backoff
+    semantics. When `deadline` expires, queued symbols are dropped and
+    whatever has completed is returned. `on_result(symbol, result)` is
+    called on the calling thread as each truthy result arrives.
+    """
+    results = {}
+    deadline = deadline or Deadline()
+
+    def collect(symbol, data):
+        results[symbol] = data
+        if on_result:
+            on_result(symbol, data)
+
+    if workers <= 1:
+        for symbol in tqdm(symbols, desc=desc):
+            if deadline.expired():
+                tqdm.write(f"⏰ Deadline {deadline} hit — {len(symbols) - len(results)} tickers skipped")
+                break
+            data = fetch_fn(symbol)
+            if data:
+                collect(symbol, data)
+        return results
+
+    # Executor queue is FIFO, so submission order is the priority order
+    pool = ThreadPoolExecutor(max_workers=workers)
+    futures = {pool.submit(fetch_fn, symbol): symbol for symbol in symbols}
+    try:
+        for future in tqdm(as_completed(futures, timeout=deadline.remaining()), total=len(futures), desc=desc):
+            symbol = futures[future]
+            try:
+                data = future.result()
+            except Exception as e:
+                tqdm.write(f"❌ Worker crashed for {symbol}: {e}")
+                continue
+            if data:
+                collect(symbol, data)
+    except FuturesTimeout:
+        unfinished = sum(1 for f in futures if not f.done())
+        tqdm.write(f"⏰ Deadline {deadline} hit — publishing without {unfinished} unfinished tickers")
+    finally:
+        # In-flight calls finish in the background; their results are discarded
+        pool.shutdown(wait=not deadline.expired(), cancel_futures=True)
+    return results
@@ -1,15 +1,24 @@
 # backend/signals/fetch_global_context.py
 
 from fastapi import WebSocket, APIRouter, WebSocketDisconnect
-import yfinance as yf
-from datetime import datetime
+from datetime import datetime, timedelta
 from pytz import timezone
 import pandas as pd
-import asyncio
-import json
+import threading
+import os
+
+from backend.signals.broadcast_hub import SnapshotHub
+from backend.signals.sector_signals import is_market_open
+from backend.market_data import get_provider
+from backend import serialization
+from backend.publish import publish_json
 
 router = APIRouter()
 
+CONTEXT_PATH = "backend/cache/global_context.json"
+REFRESH_SECONDS = int(os.getenv("GLOBAL_CONTEXT_INTERVAL", "60"))
+USE_BATCH_FETCH = True  # True = one multi-ticker incremental request, False = one download per instrument
+
 symbols = {
     "SPY": "SPY",
     "QQQ": "QQQ",
@@ -23,33 +32,103 @@ symbols = {
     "2Y": "^IRX",
 }
 
-def build_global_context():
-    eastern = timezone("US/Eastern")
-    context = {"timestamp": datetime.now(eastern).isoformat()}
+# Incremental-fetch state per ticker: session date, its open, latest close, last bar time
+_session = {"sessions": {}, "opens": {}, "lasts": {}, "last_ts": {}}
+_session_lock = threading.Lock()
+
+def instrument_entry(open_price, last_price):
+    if open_price == 0 or pd.isna(open_price):
+        pct = 0
+    else:
+        pct = ((last_price - open_price) / open_price) * 100
+
+    return {
+        "last": round(last_price, 2),
+        "open": round(open_price, 2),
+        "pct_change": round(pct, 2),
+        "arrow": "up" if pct > 0 else "down" if pct < 0 else "flat"
+    }
+
+def fetch_prices_single():
+    """One full-day 1m download per instrument → {label: (open, last) | Exception}."""
+    prices = {}
     for label, ticker in symbols.items():
         try:
-            df = yf.download(ticker, period="1d", interval="1m", progress=False, auto_adjust=False)
+            df = get_provider().download(ticker, period="1d", interval="1m", progress=False, auto_adjust=False)
             if df.empty:
                 raise ValueError("No data returned")
-
-            open_price = df["Open"].iloc[0].item()
-            last_price = df["Close"].iloc[-1].item()
-
-            if open_price == 0 or pd.isna(open_price):
-                pct = 0
+            prices[label] = (df["Open"].iloc[0].item(), df["Close"].iloc[-1].item())
+        except Exception as e:
+            prices[label] = e
+    return prices
+
+def fetch_prices_batched():
+    """
+    One multi-ticker 1m request for every instrument. The first call pulls
+    the latest full session to capture each open; later calls only ask for
+    bars newer than the oldest last-seen bar.
+
+    Sessions are tracked per instrument, by the date of its bars in the
+    exchange's own timezone (ET for SPY, UTC for BTC, ...). When new bars
+    start a later session than the cached one (e.g. the cache was filled
+    overnight or at 09:30:xx, before today's first bar), the open is reset
+    to that session's first bar.
+    """
+    with _session_lock:
+        tickers = list(symbols.values())
+        complete = all(t in _session["opens"] for t in tickers)
+        if complete:
+            start = min(_session["last_ts"].values()) - timedelta(minutes=1)
+            frame = get_provider().download(tickers, start=start, interval="1m", group_by="ticker",
+                                progress=False, auto_adjust=False)
+        else:
+            frame = get_provider().download(tickers, period="1d", interval="1m", group_by="ticker",
+                                progress=False, auto_adjust=False)
+
+        if frame is not None and not frame.empty:
+            for ticker in tickers:
+                if ticker not in frame.columns.get_level_values(0):
+                    continue
+                df = frame[ticker].dropna(subset=["Close"])
+                if df.empty:
+                    continue
+                dates = df.index.date
+                session = dates[-1]
+                if _session["sessions"].get(ticker) != session:
+                    # Incremental fetches cover everything since the last bar, so this is the session's first bar
+                    first = int((dates == session).argmax())
+                    _session["opens"][ticker] = df["Open"].iloc[first].item()
+                    _session["sessions"][ticker] = session
+                _session["lasts"][ticker] = df["Close"].iloc[-1].item()
+                _session["last_ts"][ticker] = df.index[-1]
+
+        prices = {}
+        for label, ticker in symbols.items():
+            if ticker in _session["opens"] and ticker in _session["lasts"]:
+                prices[label] = (_session["opens"][ticker], _session["lasts"][ticker])
             else:
-                pct = ((last_price - open_price) / open_price) * 100
+                prices[label] = ValueError("No data returned")
+        return prices
 
-            context[label] = {
-                "last": round(last_price, 2),
-                "open": round(open_price, 2),
-                "pct_change": round(pct, 2),
-                "arrow": "up" if pct > 0 else "down" if pct < 0 else "flat"
-            }
+def build_global_context():
+    eastern = timezone("US/Eastern")
+    now = datetime.now(eastern)
+    context = {"timestamp": now.isoformat()}
 
+    prices = None
+    if USE_BATCH_FETCH:
+        try:
+            prices = fetch_prices_batched()
         except Exception as e:
-            context[label] = {"error": str(e)}
+            print(f"⚠️ Batched context fetch failed, falling back to per-instrument: {e}")
+    if prices is None:
+        prices = fetch_prices_single()
 
+    for label, result in prices.items():
+        if isinstance(result, Exception):
+            context[label] = {"error": str(result)}
+        else:
+            context[label] = instrument_entry(*result)
 
     # Spread logic
     try:
@@ -66,32 +145,51 @@ def build_global_context():
 
     return context
 
+def save_context(context):
+    try:
+        publish_json(CONTEXT_PATH, context, kind="global_context")
+        print("✅ Saved global_context.json")
+    except Exception as e:
+        print(f"❌ Failed to write global_context.json: {e}")
+
+def is_context_active():
+    # Off-hours with nobody watching there is no one to fetch for
+    return bool(context_hub.subscribers) or is_market_open()
+
+# One producer for every client: fetch once per interval, fan out deltas
+context_hub = SnapshotHub(
+    "Global context", build_global_context, REFRESH_SECONDS,
+    on_snapshot=save_context, active=is_context_active,
+)
+
+async def start_context_service():
+    # Off-hours the producer may not tick for a while; serve the last saved context meanwhile
+    if context_hub.latest is None and os.path.exists(CONTEXT_PATH):
+        try:
+            context_hub.latest = serialization.load(CONTEXT_PATH)
+        except Exception as e:
+            print(f"⚠️ Could not prime global context from disk: {e}")
+    await context_hub.start()
+
 @router.websocket("/ws/global_context")
 async def stream_context(websocket: WebSocket):
     await websocket.accept()
-    print("✅ WebSocket client connected")
+    print(f"✅ WebSocket client connected ({len(context_hub.subscribers) + 1} total)")
 
+    await start_context_service()
+    queue = context_hub.subscribe()
     try:
         while True:
-            context = build_global_context()
-
-            # ✅ Save snapshot to disk
-            try:
-                with open("backend/cache/global_context.json", "w") as f:
-                    json.dump(context, f, indent=2)
-                print("✅ Saved global_context.json")
-            except Exception as e:
-                print(f"❌ Failed to write global_context.json: {e}")
-
-            # ✅ Push to WebSocket
+            message = await queue.get()
+            # ✅ Push to WebSocket (first message is the full snapshot, then deltas)
             try:
-                await websocket.send_text(json.dumps(context))
+                await websocket.send_text(serialization.dumps(message).decode())
             except Exception as e:
                 print(f"❌ Failed to send update: {e}")
                 return  # client disconnected
-
-            await asyncio.sleep(60)
     except WebSocketDisconnect:
         print("🔌 WebSocket client disconnected")
     except Exception as e:
-        print(f"❌ WebSocket crashed: {e}")
\ No newline at end of file
+        print(f"❌ WebSocket crashed: {e}")
+    finally:
+        context_hub.unsubscribe(queue)
@@ -0,0 +1,74 @@
+## fundamentals_cache.py
+import os
+import sys
+import argparse
+from tqdm import tqdm
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from backend.signals.metadata_store import MetadataStore
+from backend.market_data import get_provider
+from backend import serialization
+from backend import cache_manifest
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "cache")
+
+# Short interest is published twice a month; float and share count drift slowly
+FUNDAMENTALS_TTL_DAYS = int(os.getenv("FUNDAMENTALS_TTL_DAYS", "7"))
+FUNDAMENTAL_FIELDS = ["shortPercentOfFloat", "floatShares", "sharesOutstanding"]
+
+
+def load_fundamentals():
+    return MetadataStore(
+        "fundamentals.json",
+        {field: FUNDAMENTALS_TTL_DAYS for field in FUNDAMENTAL_FIELDS},
+    )
+
+
+def get_short_percent(store, symbol):
+    """Cached shortPercentOfFloat for `symbol`, rounded like the live path did."""
+    value = store.get(symbol, ["shortPercentOfFloat"]).get("shortPercentOfFloat")
+    return round(value, 4) if isinstance(value, (int, float)) else None
+
+
+def refresh_fundamentals(symbols, force=False):
+    """
+    Fetch .info for symbols whose fundamentals are missing or expired.
+    Meant for off-hours runs so the 9:35 path never waits on .info.
+    """
+    store = load_fundamentals()
+    stale = list(symbols) if force else store.stale_symbols(symbols)
+    print(f"♻️ Fundamentals cached for {len(symbols) - len(stale)} tickers, fetching {len(stale)}...")
+
+    for symbol in tqdm(stale, desc="📚 Fundamentals"):
+        try:
+            info = get_provider().info(symbol.replace(".", "-"))
+            store.update(symbol, {field: info.get(field) for field in FUNDAMENTAL_FIELDS})
+        except Exception as e:
+            tqdm.write(f"⚠️ {symbol}: fundamentals fetch failed: {e}")
+
+    if stale:
+        store.save()
+    print(f"✅ Fundamentals cache saved to {store.path}")
+    return store
+
+
+def needs_refresh(symbols, max_stale_share=0.5):
+    """True when the store is missing or more than `max_stale_share` of `symbols` are stale."""
+    store = load_fundamentals()
+    if not os.path.exists(store.path) or not symbols:
+        return True
+    return len(store.stale_symbols(symbols)) > max_stale_share * len(symbols)
+
+
+def get_latest_universe_symbols():
+    path = cache_manifest.latest("universe")
+    if path is None:
+        raise FileNotFoundError("❌ No universe files found in cache.")
+    return list(serialization.load(path).keys())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the slow-changing fundamentals cache.")
+    parser.add_argument("--force", action="store_true", help="Refetch every symbol regardless of TTL")
+    args = parser.parse_args()
+    refresh_fundamentals(get_latest_universe_symbols(), force=args.force)
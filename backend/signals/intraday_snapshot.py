@@ -0,0 +1,225 @@
+## intraday_snapshot.py
+import io
+import os
+import sys
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from pytz import timezone
+from tqdm import tqdm
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from backend.market_data import get_provider
+from backend.publish import publish_bytes
+from backend.hedging import hedged_call
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "cache")
+EASTERN = timezone("US/Eastern")
+
+FIELDS = ["open", "high", "low", "close", "volume"]
+INTERVAL = os.getenv("INTRADAY_INTERVAL", "5m")
+INTERVAL_SECONDS = {"1m": 60, "5m": 300}[INTERVAL]
+CHUNK_SIZE = int(os.getenv("INTRADAY_CHUNK_SIZE", "100"))
+# A whole-session chunk is far heavier than one ticker's call, so it gets its own timeout
+CHUNK_TIMEOUT_SECONDS = float(os.getenv("INTRADAY_CHUNK_TIMEOUT_SECONDS", "45"))
+# Re-fetched bars behind the last stored one so the still-forming bar is fixed up
+OVERLAP_BARS = 1
+
+
+def snapshot_path(date_str=None):
+    date_str = date_str or datetime.now(EASTERN).strftime("%Y-%m-%d")
+    return os.path.join(CACHE_DIR, f"intraday_{INTERVAL}_{date_str}.npz")
+
+
+def _epoch_seconds(index):
+    if index.tz is None:
+        index = index.tz_localize(EASTERN)
+    return index.tz_convert("UTC").as_unit("s").asi8
+
+
+class IntradaySnapshot:
+    """
+    Today's intraday bars for the whole universe as symbols × bar-times
+    float arrays (NaN where a symbol has no bar), keyed by epoch seconds.
+    """
+
+    def __init__(self, symbols=None, times=None, fields=None):
+        self.symbols = list(symbols or [])
+        self.times = np.asarray(times if times is not None else [], dtype="int64")
+        shape = (len(self.symbols), len(self.times))
+        self.fields = fields or {f: np.full(shape, np.nan) for f in FIELDS}
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with np.load(path) as data:
+                return cls(data["symbols"].tolist(), data["times"], {f: data[f] for f in FIELDS})
+        except Exception as e:
+            print(f"⚠️ Could not read intraday snapshot {path}: {e}")
+            return cls()
+
+    def save(self, path):
+        buf = io.BytesIO()
+        np.savez(buf, symbols=np.array(self.symbols), times=self.times, **self.fields)
+        publish_bytes(path, buf.getvalue(), kind="intraday_snapshot")
+
+    def last_time(self):
+        return int(self.times[-1]) if len(self.times) else None
+
+    def merge(self, frames):
+        """Merge {symbol: OHLCV DataFrame}; newer values overwrite overlapping bars."""
+        frames = {s: df for s, df in frames.items() if df is not None and not df.empty}
+        if not frames:
+            return
+        new_symbols = [s for s in frames if s not in self.index]
+        symbols = self.symbols + new_symbols
+        epochs = {s: _epoch_seconds(df.index) for s, df in frames.items()}
+        times = np.union1d(self.times, np.concatenate(list(epochs.values())))
+
+        old_cols = np.searchsorted(times, self.times)
+        fields = {}
+        for f in FIELDS:
+            arr = np.full((len(symbols), len(times)), np.nan)
+            arr[:len(self.symbols), old_cols] = self.fields[f]
+            fields[f] = arr
+
+        sym_pos = {s: i for i, s in enumerate(symbols)}
+        for symbol, df in frames.items():
+            cols = np.searchsorted(times, epochs[symbol])
+            for f, col in zip(FIELDS, ["Open", "High", "Low", "Close", "Volume"]):
+                arr = fields[f]
+                arr[sym_pos[symbol], cols] = df[col].to_numpy(dtype="float64")
+
+        self.__init__(symbols, times, fields)
+
+    def _window(self, start, end):
+        """Column indices whose US/Eastern bar time falls in [start, end] of the snapshot's session."""
+        if not len(self.times):
+            return np.array([], dtype=int)
+        local = pd.to_datetime(self.times, unit="s", utc=True).tz_convert(EASTERN)
+        session = local[-1].date()
+        minutes = local.hour * 60 + local.minute
+        lo = int(start[:2]) * 60 + int(start[3:])
+        hi = int(end[:2]) * 60 + int(end[3:])
+        mask = (local.date == session) & (minutes >= lo) & (minutes <= hi)
+        return np.flatnonzero(mask)
+
+    def _valid_cols(self, i, cols):
+        return cols[~np.isnan(self.fields["close"][i, cols])]
+
+    def opening_range(self):
+        """
+        09:30–09:45 range inputs used by the 9:45 job, per symbol. Bars are
+        picked by start time, so any INTERVAL works: the range spans bars
+        starting 09:30–09:39, close_945 is the close of the last bar
+        starting 09:40–09:44. Symbols missing any bar in either window (late
+        or partial fetch) are left out rather than ranged on fewer bars.
+        """
+        range_cols = self._window("09:30", "09:39")
+        close_cols = self._window("09:40", "09:44")
+        range_bars = 600 // INTERVAL_SECONDS
+        close_bars = 300 // INTERVAL_SECONDS
+        out = {}
+        now = datetime.now().isoformat()
+        for symbol, i in self.index.items():
+            in_range = self._valid_cols(i, range_cols)
+            closing = self._valid_cols(i, close_cols)
+            if len(in_range) < range_bars or len(closing) < close_bars:
+                continue
+            out[symbol] = {
+                "940_high": round(float(np.max(self.fields["high"][i, in_range])), 2),
+                "940_low": round(float(np.min(self.fields["low"][i, in_range])), 2),
+                "close_945": round(float(self.fields["close"][i, closing[-1]]), 2),
+                "timestamp": now,
+            }
+        return out
+
+    def early_moves(self):
+        """% move from the 09:30 open to the latest close at or before 09:35, per symbol."""
+        cols = self._window("09:30", "09:35")
+        out = {}
+        for symbol, i in self.index.items():
+            valid = self._valid_cols(i, cols)
+            if not len(valid):
+                continue
+            early_open = self.fields["open"][i, valid[0]]
+            early_close = self.fields["close"][i, valid[-1]]
+            if not np.isnan(early_open) and early_open != 0:
+                out[symbol] = round(float((early_close - early_open) / early_open * 100), 2)
+        return out
+
+
+def _download_single(symbol, **kwargs):
+    return get_provider().history(symbol.replace(".", "-"), interval=INTERVAL, **kwargs)
+
+
+def _download_chunk(symbols, **kwargs):
+    yf_symbols = {s.replace(".", "-"): s for s in symbols}
+    frame = get_provider().download(list(yf_symbols), interval=INTERVAL, group_by="ticker",
+                        auto_adjust=False, progress=False, threads=True, **kwargs)
+    if frame is None or frame.empty:
+        raise ValueError("No data returned for chunk")
+    frames = {}
+    for yf_symbol, symbol in yf_symbols.items():
+        if yf_symbol in frame.columns.get_level_values(0):
+            frames[symbol] = frame[yf_symbol].dropna(subset=["Close"])
+    return frames
+
+
+def refresh_snapshot(symbols, path=None, deadline=None):
+    """
+    Bring today's snapshot up to date for `symbols` and return it. The
+    first call pulls the whole session in multi-ticker chunks; later calls
+    only request bars from the last stored bar onward. A failed chunk
+    falls back to per-symbol requests. Chunks follow the order of
+    `symbols`; once `deadline` expires the remaining chunks are skipped.
+    """
+    path = path or snapshot_path()
+    snapshot = IntradaySnapshot.load(path)
+    last = snapshot.last_time()
+    missing = [s for s in symbols if s not in snapshot.index]
+    current = [s for s in symbols if s in snapshot.index]
+
+    jobs = []
+    if missing or last is None:
+        jobs.append((missing if last is not None else list(symbols), {"period": "1d"}))
+    if current and last is not None:
+        start = datetime.fromtimestamp(last - OVERLAP_BARS * INTERVAL_SECONDS, tz=EASTERN)
+        jobs.append((current, {"start": start}))
+
+    for group, kwargs in jobs:
+        mode = "full session" if "period" in kwargs else f"since {kwargs['start']:%H:%M}"
+        print(f"📥 Intraday {INTERVAL} snapshot: {len(group)} tickers ({mode})")
+        chunks = [group[i:i + CHUNK_SIZE] for i in range(0, len(group), CHUNK_SIZE)]
+        for n, chunk in enumerate(tqdm(chunks, desc="📥 Intraday chunks")):
+            if deadline is not None and deadline.expired():
+                skipped = sum(map(len, chunks[n:]))
+                tqdm.write(f"⏰ Deadline {deadline} hit — skipping {skipped} tickers")
+                break
+            try:
+                # No second source for intraday bars: hedged_call is only the timeout and breaker here
+                frames, _ = hedged_call(
+                    "intraday_chunk",
+                    [("yfinance", lambda chunk=chunk: _download_chunk(chunk, **kwargs))],
+                    timeout=CHUNK_TIMEOUT_SECONDS,
+                )
+            except Exception as e:
+                tqdm.write(f"⚠️ Chunk of {len(chunk)} failed, falling back to single-symbol fetch: {e}")
+                frames = {}
+                for symbol in chunk:
+                    try:
+                        frames[symbol], _ = hedged_call(
+                            "intraday_single", [("yfinance", lambda symbol=symbol: _download_single(symbol, **kwargs))]
+                        )
+                    except Exception as e:
+                        tqdm.write(f"⚠️ Failed for {symbol}: {e}")
+            snapshot.merge(frames)
+            # Saved per chunk so a crashed run resumes with only the missing symbols
+            snapshot.save(path)
+
+    snapshot.save(path)
+    print(f"✅ Intraday snapshot saved: {len(snapshot.symbols)} tickers × {len(snapshot.times)} bars → {path}")
+    return snapshot
@@ -0,0 +1,78 @@
+## metadata_store.py
+import os
+from datetime import datetime, timedelta
+
+from backend import serialization
+from backend.publish import publish_json
+
+STORE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "cache", "store"))
+
+
+class MetadataStore:
+    """
+    Persistent per-symbol field store with per-field TTLs.
+
+    Entries are kept as {symbol: {field: {"value": ..., "fetched_at": iso}}}
+    so each field can expire on its own schedule. A missing value (None) is
+    usually a throttled or partial .info response rather than a real gap, so
+    it only stays fresh for `missing_ttl_hours` and never replaces a value
+    already known; symbols that truly lack e.g. a sector are refetched once
+    a day.
+    """
+
+    def __init__(self, filename, ttls, default_ttl_days=7, missing_ttl_hours=12):
+        self.path = os.path.join(STORE_DIR, filename)
+        self.ttls = {field: timedelta(days=days) for field, days in ttls.items()}
+        self.default_ttl = timedelta(days=default_ttl_days)
+        self.missing_ttl = timedelta(hours=missing_ttl_hours)
+        self.entries = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            return serialization.load(self.path)
+        except Exception as e:
+            print(f"⚠️ Could not read metadata store {self.path}: {e}")
+            return {}
+
+    def save(self):
+        os.makedirs(STORE_DIR, exist_ok=True)
+        publish_json(self.path, self.entries)
+
+    def _is_fresh(self, field_entry, field, now):
+        try:
+            fetched_at = datetime.fromisoformat(field_entry["fetched_at"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        ttl = self.ttls.get(field, self.default_ttl)
+        if field_entry.get("value") is None:
+            ttl = min(ttl, self.missing_ttl)
+        return now - fetched_at < ttl
+
+    def stale_fields(self, symbol, fields=None, now=None):
+        """Fields of `symbol` that are missing or past their TTL."""
+        now = now or datetime.now()
+        fields = fields or list(self.ttls)
+        entry = self.entries.get(symbol, {})
+        return [f for f in fields if f not in entry or not self._is_fresh(entry[f], f, now)]
+
+    def stale_symbols(self, symbols, fields=None):
+        now = datetime.now()
+        return [s for s in symbols if self.stale_fields(s, fields, now)]
+
+    def get(self, symbol, fields=None):
+        """Current values for `symbol`, regardless of freshness."""
+        entry = self.entries.get(symbol, {})
+        fields = fields or list(entry)
+        return {f: entry[f].get("value") for f in fields if f in entry}
+
+    def update(self, symbol, values):
+        now = datetime.now().isoformat()
+        entry = self.entries.setdefault(symbol, {})
+        for field, value in values.items():
+            if value is None and entry.get(field, {}).get("value") is not None:
+                # Keep serving the old value; the field stays stale and is retried next run
+                continue
+            entry[field] = {"value": value, "fetched_at": now}
+
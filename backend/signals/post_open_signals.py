@@ -1,12 +1,22 @@
 ## post_open_signals.py
 import os
-import json
-import yfinance as yf
-import time
-import random
+import sys
+import argparse
 from datetime import datetime
 from tqdm import tqdm
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from backend.signals.fetch_engine import PhaseTimer, Deadline, run_concurrent, order_by_level, coverage_report
+from backend.market_data import get_provider
+from backend.hedging import hedged_call, hedging_report
+from backend import serialization
+from backend import cache_manifest
+from backend.publish import publish_json
+from backend.signals.fundamentals_cache import load_fundamentals, get_short_percent
+from backend.signals.daily_store import update_daily_store
+from backend.signals.intraday_snapshot import refresh_snapshot
+from backend.signals.checkpoint import Checkpoint, PartialPublisher
+
 CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "cache")
 os.makedirs(CACHE_DIR, exist_ok=True)
 
@@ -17,6 +27,18 @@ LOOKBACK_DAYS = 10
 # --- Data Source Toggle ---
 USE_BATCH_DOWNLOAD = False  # True = use yf.download, False = use Ticker().history
 
+# --- Concurrency ---
+USE_CONCURRENT_FETCH = True  # True = bounded thread pool, False = one ticker at a time
+MAX_WORKERS = int(os.getenv("POST_OPEN_WORKERS", "8"))
+
+# --- Publish Deadline (US/Eastern) ---
+# Job fires at 09:35:50; whatever is in hand by the deadline gets published
+DEADLINE = os.getenv("POST_OPEN_DEADLINE", "09:37:00")
+
+# --- Streaming Output ---
+# Partial output is republished this often so enrichment can start early
+PUBLISH_INTERVAL_SECONDS = int(os.getenv("POST_OPEN_PUBLISH_SECONDS", "10"))
+
 # --- Squeeze Watch Thresholds ---
 SQUEEZE_SHORT_THRESH = 0.20     # e.g. 20% short interest
 SQUEEZE_REL_VOL_THRESH = 1.20   # e.g. 1.2x relative volume
@@ -29,131 +51,165 @@ SECTOR_ETFS = [
 ]
 
 def get_latest_universe_file():
-    files = [
-        f for f in os.listdir(CACHE_DIR)
-        if (
-            f.startswith("universe_")
-            and f.endswith(".json")
-            and "cache" not in f
-            and "enriched" not in f
-            and "scored" not in f
-        )
-    ]
-    if not files:
+    path = cache_manifest.latest("universe")
+    if path is None:
         raise FileNotFoundError("❌ No valid universe files found in cache.")
-    files.sort(key=lambda f: os.path.getmtime(os.path.join(CACHE_DIR, f)), reverse=True)
-    return os.path.join(CACHE_DIR, files[0])
+    return path
 
-def fetch_yf_data(symbol, lookback_days=10, retries=3):
+# Filled off-hours by fundamentals_cache.py; read-only during the post-open window
+FUNDAMENTALS = load_fundamentals()
+
+def live_quote_from_daily(today_bar, prev_close):
+    """
+    Price/volume fields for the current session from today's (partial)
+    daily bar; prev_close comes from the local daily store.
+    """
+    if today_bar is None or today_bar.empty:
+        return {}
+    today = today_bar.iloc[-1]
+    last_price = float(today["Close"])
+    pct_change = (
+        round(((last_price - prev_close) / prev_close) * 100, 4)
+        if prev_close else None
+    )
+    return {
+        "last_price": round(last_price, 4),
+        "vol_latest": int(today["Volume"]),
+        "pct_change": pct_change,
+        "open_price": round(float(today["Open"]), 4),
+        "prev_close": prev_close,
+    }
+
+def yf_today_bar(symbol):
     yf_symbol = symbol.replace(".", "-")
+    if USE_BATCH_DOWNLOAD:
+        return get_provider().download(
+            yf_symbol,
+            period="1d",
+            interval="1d",
+            auto_adjust=False,
+            progress=False,
+        )
+    return get_provider().history(yf_symbol, period="1d", interval="1d")
+
+def tv_today_bar(symbol):
+    """Today's daily bar from TradingView, shaped like a yfinance frame."""
+    from tvDatafeed import Interval
+    bars = get_provider().tv_hist(symbol, exchange="", interval=Interval.in_daily, n_bars=1)
+    if bars is None or bars.empty:
+        raise ValueError(f"No TradingView daily bar for {symbol}")
+    return bars.rename(columns=str.title)[["Open", "High", "Low", "Close", "Volume"]]
+
+def yf_sector_quote(etf):
+    data = get_provider().info(etf)
+    return {
+        "last_price": data.get("regularMarketPrice"),
+        "prev_close": data.get("previousClose"),
+        "changePercent": data.get("regularMarketChangePercent")
+    }
+
+def tv_sector_quote(etf):
+    from tvDatafeed import Interval
+    bars = get_provider().tv_hist(etf, exchange="", interval=Interval.in_daily, n_bars=2)
+    if bars is None or len(bars) < 2:
+        raise ValueError(f"No TradingView daily bars for {etf}")
+    last_price, prev_close = float(bars["close"].iloc[-1]), float(bars["close"].iloc[-2])
+    return {
+        "last_price": last_price,
+        "prev_close": prev_close,
+        "changePercent": (last_price - prev_close) / prev_close * 100 if prev_close else None
+    }
+
+def fetch_yf_data(symbol, history=None, retries=3):
+    """
+    Live fields for one ticker. `history` is this ticker's entry from
+    DailyStore.lookback_stats, so no historical days are downloaded here;
+    intraday bars come from the shared intraday snapshot.
+    """
+    history = history or {}
     for attempt in range(retries):
         try:
-            ticker = yf.Ticker(yf_symbol)
-
-            if USE_BATCH_DOWNLOAD:
-                try:
-                    daily_hist = yf.download(
-                        yf_symbol,
-                        period=f"{lookback_days + 1}d",
-                        interval="1d",
-                        auto_adjust=False,
-                        progress=False,
-                    )
-                except Exception as e:
-                    tqdm.write(f"⚠️ Failed daily download for {symbol}: {e}")
-                    daily_hist = None
-
-                try:
-                    intraday_hist = yf.download(
-                        yf_symbol,
-                        period="1d",
-                        interval="5m",
-                        auto_adjust=False,
-                        progress=False,
-                    )
-                except Exception as e:
-                    tqdm.write(f"⚠️ Failed intraday download for {symbol}: {e}")
-                    intraday_hist = None
-            else:
-                daily_hist = ticker.history(period=f"{lookback_days + 1}d", interval="1d")
-                intraday_hist = ticker.history(period="1d", interval="5m")
-
-            info = ticker.info
-
-            rel_vol, avg_vol_10d = None, None
-            if daily_hist is not None and not daily_hist.empty and len(daily_hist) >= 10:
-                # convert timezone to US/Eastern if needed
-                if daily_hist.index.tz is not None:
-                    daily_hist.index = daily_hist.index.tz_convert("US/Eastern")
-                else:
-                    daily_hist.index = daily_hist.index.tz_localize("UTC").tz_convert("US/Eastern")
-
-                past_volumes = daily_hist['Volume'][:-1]
-                avg_vol_10d = past_volumes.mean()
-                today_volume = daily_hist['Volume'].iloc[-1]
-                rel_vol = today_volume / avg_vol_10d if avg_vol_10d > 0 else 0
-
-            early_move = None
-            if intraday_hist is not None and not intraday_hist.empty:
-                if intraday_hist.index.tz is not None:
-                    intraday_hist.index = intraday_hist.index.tz_convert("US/Eastern")
-                else:
-                    intraday_hist.index = intraday_hist.index.tz_localize("UTC").tz_convert("US/Eastern")
-
-                early_candle = intraday_hist.between_time("09:30", "09:35")
-                if not early_candle.empty:
-                    early_open = early_candle['Open'].iloc[0]
-                    early_close = early_candle['Close'].iloc[-1]
-                    if early_open and early_close and early_open != 0:
-                        early_move = round(((early_close - early_open) / early_open) * 100, 2)
+            # yfinance first; TradingView's daily bar is the hedge when it is slow or down
+            today_bar, quote_source = hedged_call("daily_bar", [
+                ("yfinance", lambda: yf_today_bar(symbol)),
+                ("tradingview", lambda: tv_today_bar(symbol)),
+            ])
 
+            # Live quote from today's bar; lookback stats from the daily store; fundamentals from cache
+            quote = live_quote_from_daily(today_bar, history.get("prev_close"))
             output = {
-                "last_price": info.get("regularMarketPrice"),
-                "vol_latest": info.get("volume"),
-                "pct_change": info.get("regularMarketChangePercent"),
-                "open_price": info.get("open"),
-                "prev_close": info.get("previousClose"),
-                "shortPercentOfFloat": (
-                    round(info.get("shortPercentOfFloat", 0), 4)
-                    if isinstance(info.get("shortPercentOfFloat"), (int, float))
-                    else None
-                ),
+                **quote,
+                "shortPercentOfFloat": get_short_percent(FUNDAMENTALS, symbol),
                 "timestamp": datetime.now().isoformat(),
+                "field_sources": {
+                    "quote": quote_source,
+                    "lookback": "daily_store",
+                    "shortPercentOfFloat": "fundamentals_cache",
+                },
             }
 
-            if rel_vol is not None:
-                output["rel_vol"] = round(rel_vol, 2)
-            if avg_vol_10d is not None:
+            avg_vol_10d = history.get("avg_vol_10d")
+            if avg_vol_10d is not None and quote.get("vol_latest") is not None:
+                output["rel_vol"] = round(quote["vol_latest"] / avg_vol_10d, 2)
                 output["avg_vol_10d"] = int(avg_vol_10d)
-            if early_move is not None:
-                output["early_percent_move"] = early_move
-
-            if daily_hist is not None and not daily_hist.empty:
-                output["hi_10d"] = round(daily_hist["High"][:-1].max(), 2)
-                output["lo_10d"] = round(daily_hist["Low"][:-1].min(), 2)
-                if len(daily_hist) >= 2:
-                    output["pd_hi"] = round(daily_hist["High"].iloc[-2], 2)
-                    output["pd_lo"] = round(daily_hist["Low"].iloc[-2], 2)
+            for key in ("hi_10d", "lo_10d", "pd_hi", "pd_lo"):
+                if history.get(key) is not None:
+                    output[key] = history[key]
 
             return output
 
         except Exception as e:
             if attempt < retries - 1:
-                sleep_time = random.uniform(1.5, 3.5)
+                # Backoff is the rate limiter's job; it already saw this failure
                 tqdm.write(f"🔁 Retry {attempt + 1} for {symbol} after error: {e}")
-                time.sleep(sleep_time)
             else:
                 tqdm.write(f"❌ Failed for {symbol} after {retries} attempts: {e}")
                 return None
 
-def main():
-    universe_path = get_latest_universe_file()
-    with open(universe_path, "r") as f:
-        universe = json.load(f)
-    symbols = list(universe.keys())
+def process_ticker(symbol, history=None, early_move=None):
+    data = fetch_yf_data(symbol, history)
+    if not data:
+        return None
+    if early_move is not None:
+        data["early_percent_move"] = early_move
+        data["field_sources"]["early_percent_move"] = "intraday_snapshot"
+
+    # Tier 2: squeeze watch
+    short_pct = data.get("shortPercentOfFloat")
+    rel_vol = data.get("rel_vol") or 0
+    pct_change = data.get("pct_change")
+    if (
+        short_pct is not None
+        and pct_change is not None
+        and short_pct >= SQUEEZE_SHORT_THRESH
+        and rel_vol > SQUEEZE_REL_VOL_THRESH
+        and abs(pct_change) >= SQUEEZE_PCT_MOVE_THRESH
+    ):
+        data["squeeze_watch"] = True
+
+    # Tier 3: near multi-day high/low
+    price = data.get("last_price")
+    if price and data.get("hi_10d") and price >= data["hi_10d"] * 0.98:
+        data["near_multi_day_hi_10d"] = True
+    if price and data.get("lo_10d") and price <= data["lo_10d"] * 1.02:
+        data["near_multi_day_lo_10d"] = True
+    return data
+
+def main(deadline_str=DEADLINE):
+    timer = PhaseTimer()
+    deadline = Deadline(deadline_str)
+
+    with timer.phase("load_universe"):
+        universe_path = get_latest_universe_file()
+        universe = serialization.load(universe_path)
+        # L0 anchors first, then L1, then L2, so the names that matter land before the deadline
+        symbols = order_by_level(universe)
 
     # ✅ Print the data mode being used
     print(f"📥 Mode: {'yf.download()' if USE_BATCH_DOWNLOAD else 'Ticker().history()'}")
+    workers = MAX_WORKERS if USE_CONCURRENT_FETCH else 1
+    print(f"🧵 Workers: {workers}")
+    print(f"⏰ Publish deadline: {deadline}")
 
     combined_output = {
         "timestamp": datetime.now().isoformat(),
@@ -162,59 +218,83 @@ def main():
     }
 
     print("📊 Fetching sector ETF prices...")
-    for etf in SECTOR_ETFS:
-        try:
-            data = yf.Ticker(etf).info
-            combined_output["sectors"][etf] = {
-                "last_price": data.get("regularMarketPrice"),
-                "prev_close": data.get("previousClose"),
-                "changePercent": data.get("regularMarketChangePercent")
-            }
-        except Exception as e:
-            tqdm.write(f"⚠️ Failed to fetch sector {etf}: {e}")
-
-    print(f"📡 Fetching post-open signals + highs/lows for {len(symbols)} tickers...")
-    for symbol in tqdm(symbols, desc="🔄 Scraping Tickers"):
-        data = fetch_yf_data(symbol, LOOKBACK_DAYS)
-        if not data:
-            continue
-
-        # Tier 2: squeeze watch
-        short_pct = data.get("shortPercentOfFloat")
-        rel_vol = data.get("rel_vol") or 0
-        pct_change = data.get("pct_change")
-        if (
-            short_pct is not None
-            and pct_change is not None
-            and short_pct >= SQUEEZE_SHORT_THRESH
-            and rel_vol > SQUEEZE_REL_VOL_THRESH
-            and abs(pct_change) >= SQUEEZE_PCT_MOVE_THRESH
-        ):
-            data["squeeze_watch"] = True
-
-        # Tier 3: near multi-day high/low
-        price = data.get("last_price")
-        if price and data.get("hi_10d") and price >= data["hi_10d"] * 0.98:
-            data["near_multi_day_hi_10d"] = True
-        if price and data.get("lo_10d") and price <= data["lo_10d"] * 1.02:
-            data["near_multi_day_lo_10d"] = True
-
-        combined_output["tickers"][symbol] = data
-        time.sleep(random.uniform(0.3, 0.6))
-
-    # Tier 3: top-5 volume gainers
-    top5 = sorted(
-        combined_output["tickers"].items(),
-        key=lambda kv: kv[1].get("vol_latest") or 0,
-        reverse=True
-    )[:5]
-    for sym, _ in top5:
-        combined_output["tickers"][sym]["top_volume_gainer"] = True
-
-    # Single final write
-    with open(OUTPUT_PATH, "w") as f:
-        json.dump(combined_output, f, indent=2)
+    with timer.phase("sector_etfs"):
+        for etf in SECTOR_ETFS:
+            try:
+                quote, source = hedged_call("sector_quote", [
+                    ("yfinance", lambda: yf_sector_quote(etf)),
+                    ("tradingview", lambda: tv_sector_quote(etf)),
+                ])
+                combined_output["sectors"][etf] = {**quote, "source": source}
+            except Exception as e:
+                tqdm.write(f"⚠️ Failed to fetch sector {etf}: {e}")
+
+    # Historical days come from the local store (normally already current from the 06:15 job)
+    with timer.phase("daily_history"):
+        history = update_daily_store(symbols).lookback_stats(symbols, LOOKBACK_DAYS)
+    print(f"📚 Lookback stats ready for {len(history)}/{len(symbols)} tickers")
+
+    # Shared 5m bars for the session; the 9:45 job appends to the same snapshot
+    with timer.phase("intraday_snapshot"):
+        early_moves = refresh_snapshot(symbols, deadline=deadline).early_moves()
+
+    # Every result is streamed to the checkpoint; a restart after a crash only fetches the rest
+    checkpoint = Checkpoint("post_open_signals", TODAY_STR)
+    fetched = checkpoint.load()
+    if fetched:
+        print(f"♻️ Resuming from checkpoint: {len(fetched)} tickers already fetched")
+    pending = [s for s in symbols if s not in fetched]
+    publisher = PartialPublisher(OUTPUT_PATH, PUBLISH_INTERVAL_SECONDS, kind="post_open_signals")
+
+    def build_output(partial):
+        # Keep universe order in the output regardless of fetch or completion order
+        tickers = {s: fetched[s] for s in universe if s in fetched}
+        return {**combined_output, "tickers": tickers, "partial": partial}
+
+    def on_result(symbol, data):
+        fetched[symbol] = data
+        checkpoint.append(symbol, data)
+        if publisher.maybe_publish(lambda: build_output(True)):
+            tqdm.write(f"📤 Partial post-open signals published ({len(fetched)}/{len(symbols)})")
+
+    print(f"📡 Fetching post-open signals for {len(pending)} tickers...")
+    with timer.phase("tickers"):
+        run_concurrent(
+            pending,
+            lambda symbol: process_ticker(symbol, history.get(symbol), early_moves.get(symbol)),
+            workers=workers,
+            desc="🔄 Scraping Tickers",
+            deadline=deadline,
+            on_result=on_result,
+        )
+        combined_output = build_output(False)
+    print(f"📈 Fetched {len(combined_output['tickers'])}/{len(symbols)} tickers")
+
+    with timer.phase("post_process"):
+        # Tier 3: top-5 volume gainers
+        top5 = sorted(
+            combined_output["tickers"].items(),
+            key=lambda kv: kv[1].get("vol_latest") or 0,
+            reverse=True
+        )[:5]
+        for sym, _ in top5:
+            combined_output["tickers"][sym]["top_volume_gainer"] = True
+
+    combined_output["coverage"] = coverage_report(universe, combined_output["tickers"], deadline)
+    combined_output["hedging"] = hedging_report()
+    # A file can't time its own write: the published timings stop before it,
+    # and the printed report below adds the write phase
+    combined_output["timings"] = timer.summary()
+
+    # Final write replaces the last partial; the checkpoint is no longer needed
+    with timer.phase("write"):
+        publish_json(OUTPUT_PATH, combined_output, kind="post_open_signals")
+        checkpoint.discard()
     print(f"✅ Final post-open signals saved to: {OUTPUT_PATH}")
+    timer.report()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Post-open signal scrape.")
+    parser.add_argument("--deadline", default=DEADLINE, help="Publish by HH:MM[:SS] ET; empty string disables")
+    args = parser.parse_args()
+    main(args.deadline)
@@ -1,12 +1,22 @@
 # backend/signals/sector_signals.py
 import os
-import json
+import sys
 import asyncio
 import argparse
-import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, time as dt_time
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from pytz import timezone
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from backend.signals.broadcast_hub import SnapshotHub
+from backend.market_data import get_provider
+from backend import serialization
+from backend import cache_manifest
+from backend.publish import publish_json
+
+router = APIRouter()
+
 # --- Configuration ---
 SECTORS = {
     "XLK": "Technology",
@@ -24,6 +34,7 @@ SECTORS = {
 
 CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "cache")
 os.makedirs(CACHE_DIR, exist_ok=True)
+REFRESH_SECONDS = int(os.getenv("SECTOR_INTERVAL_SECONDS", "10"))
 
 # Dynamic output filename with current date
 def get_out_path():
@@ -41,41 +52,91 @@ def is_market_open():
     current_time = now.time()
     return dt_time(9, 30) <= current_time <= dt_time(16, 0)
 
-async def fetch_sector_prices():
+def fetch_sector(symbol):
+    sector = SECTORS[symbol]
+    try:
+        data = get_provider().history(symbol, period="1d", interval="1m")
+        if data.empty:
+            return None
+        latest = data.iloc[-1]
+        open_price = data.iloc[0]["Open"]
+        last_price = latest["Close"]
+        change = ((last_price - open_price) / open_price) * 100
+        return {
+            "sector": sector,
+            "price": round(last_price, 2),
+            "changePercent": round(change, 2),
+        }
+    except Exception as e:
+        return {"error": str(e)}
+
+def fetch_sector_prices():
+    """Fetch every sector ETF concurrently and return one snapshot dict."""
     results = {}
-    for symbol, sector in SECTORS.items():
-        try:
-            data = yf.Ticker(symbol).history(period="1d", interval="1m")
-            if data.empty:
-                continue
-            latest = data.iloc[-1]
-            open_price = data.iloc[0]["Open"]
-            last_price = latest["Close"]
-            change = ((last_price - open_price) / open_price) * 100
-            results[symbol] = {
-                "sector": sector,
-                "price": round(last_price, 2),
-                "changePercent": round(change, 2),
-            }
-        except Exception as e:
-            results[symbol] = {"error": str(e)}
+    with ThreadPoolExecutor(max_workers=len(SECTORS)) as pool:
+        for symbol, entry in zip(SECTORS, pool.map(fetch_sector, SECTORS)):
+            if entry is not None:
+                results[symbol] = entry
     # Add snapshot timestamp in UTC
     results["_timestamp"] = datetime.utcnow().isoformat() + "Z"
+    return results
+
+def save_snapshot(results):
     out_path = get_out_path()
-    with open(out_path, "w") as f:
-        json.dump(results, f, indent=2)
+    publish_json(out_path, results, kind="sector")
     print(f"✅ Sector data saved to {out_path} (snapshot at {results['_timestamp']})")
 
+def load_latest_snapshot():
+    """Latest dated sector file as (date, data), or (None, None)."""
+    entry = cache_manifest.latest_entry("sector")
+    if entry is None:
+        return None, None
+    return entry["date"], serialization.load(os.path.join(cache_manifest.CACHE_DIR, entry["file"]))
+
+def snapshot_date(snapshot):
+    """US/Eastern trading date of an in-memory snapshot."""
+    ts = datetime.fromisoformat(snapshot["_timestamp"].rstrip("Z"))
+    return timezone("UTC").localize(ts).astimezone(timezone("US/Eastern")).strftime("%Y-%m-%d")
+
+# In-process service: one fetch per interval, pushed to /ws/sector subscribers
+sector_hub = SnapshotHub(
+    "Sector rotation", fetch_sector_prices, REFRESH_SECONDS,
+    on_snapshot=save_snapshot, active=is_market_open,
+)
+
+async def start_sector_service():
+    if sector_hub.latest is None:
+        try:
+            _, sector_hub.latest = load_latest_snapshot()
+        except Exception as e:
+            print(f"⚠️ Could not prime sector snapshot from disk: {e}")
+    await sector_hub.start()
+
+@router.websocket("/ws/sector")
+async def stream_sectors(websocket: WebSocket):
+    await websocket.accept()
+    queue = sector_hub.subscribe()
+    try:
+        while True:
+            message = await queue.get()
+            await websocket.send_text(serialization.dumps(message).decode())
+    except WebSocketDisconnect:
+        print("🔌 Sector WebSocket client disconnected")
+    except Exception as e:
+        print(f"❌ Sector WebSocket closed: {e}")
+    finally:
+        sector_hub.unsubscribe(queue)
+
 async def run_loop(interval_seconds):
     while True:
         if is_market_open():
-            await fetch_sector_prices()
+            save_snapshot(await asyncio.to_thread(fetch_sector_prices))
         else:
             print("⏸️ Market closed — skipping sector update")
         await asyncio.sleep(interval_seconds)
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Fetch and save sector rotation data on a loop.")
+    parser = argparse.ArgumentParser(description="Fetch and save sector rotation data on a loop (standalone; the API runs this in-process).")
     parser.add_argument(
         "--interval",
         type=int,
@@ -2,13 +2,17 @@
 from shutil import copyfile
 import re
 import csv
-import json
 import os
+import sys
 import requests
-import yfinance as yf
 from datetime import datetime
 from tqdm import tqdm
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from backend.signals.metadata_store import MetadataStore
+from backend.market_data import get_provider
+from backend.publish import publish_json
+
 # === CONFIG ===
 ANCHOR_TICKERS = ["SPY", "QQQ", "AAPL", "MSFT", "TSLA", "NVDA", "GME", "KSS", 
                   "AMC", "BYND", "LMND", "GRRR", "HIMS", "PFE", "MRNA", "BNTX", 
@@ -24,6 +28,12 @@ LOG_FILE = "backend/logs/universe_build.log"
 TODAY_STR = datetime.now().strftime("%Y-%m-%d")
 CACHE_FILE = os.path.join(CACHE_DIR, f"universe_{TODAY_STR}.json")
 
+# Sector/industry barely move; only new or expired symbols hit yfinance
+METADATA_TTL_DAYS = {
+    "sector": int(os.getenv("METADATA_SECTOR_TTL_DAYS", "30")),
+    "industry": int(os.getenv("METADATA_INDUSTRY_TTL_DAYS", "30")),
+}
+
 # === FETCH S&P 500 FROM GITHUB ===
 def fetch_sp500_csv(save_path):
     url = "https://raw.githubusercontent.com/datasets/s-and-p-500-companies/master/data/constituents.csv"
@@ -110,26 +120,34 @@ def build_universe():
 
         universe[ticker] = {"sources": sources, "level": level}
 
-    # fetch sector & industry via yfinance
-    print("🔍 Fetching sector/industry for each ticker...")
-    for ticker, info in tqdm(universe.items(), desc="Sector scrape", ncols=80):
+    # fetch sector & industry via yfinance (new or expired symbols only)
+    store = MetadataStore("ticker_metadata.json", METADATA_TTL_DAYS)
+    stale = store.stale_symbols(list(universe))
+    print(f"♻️ Metadata cached for {len(universe) - len(stale)} tickers, fetching {len(stale)}...")
+    for ticker in tqdm(stale, desc="Sector scrape", ncols=80):
         try:
-            data = yf.Ticker(ticker).info
-            sector = data.get("sector")
-            industry = data.get("industry")
-            if sector:
-                info["sector"] = sector
-            if industry:
-                info["industry"] = industry
+            data = get_provider().info(ticker)
+            store.update(ticker, {
+                "sector": data.get("sector"),
+                "industry": data.get("industry"),
+            })
         except Exception as e:
             print(f"⚠️ {ticker}: sector scrape failed: {e}")
+    if stale:
+        store.save()
+
+    for ticker, info in universe.items():
+        meta = store.get(ticker, ["sector", "industry"])
+        if meta.get("sector"):
+            info["sector"] = meta["sector"]
+        if meta.get("industry"):
+            info["industry"] = meta["industry"]
 
     # persist
-    with open(CACHE_FILE, "w") as f:
-        json.dump(universe, f, indent=2)
+    publish_json(CACHE_FILE, universe, kind="universe")
 
     with open(LOG_FILE, "a") as log:
-        log.write(f"[{datetime.now()}] Built universe: {len(universe)} tickers\n")
+        log.write(f"[{datetime.now()}] Built universe: {len(universe)} tickers ({len(stale)} metadata fetches)\n")
 
     print(f"✅ Universe cached: {CACHE_FILE} | Total: {len(universe)} tickers")
 
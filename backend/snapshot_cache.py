@@ -0,0 +1,267 @@
+# backend/snapshot_cache.py
+"""
+In-process cache of the JSON snapshots served by the read endpoints.
+
+Artifacts looked up by kind are keyed by their manifest generation:
+every publish bumps it, and since publishes are atomic renames a cached
+generation is always a complete file, so a hit needs no stat at all.
+Plain paths are keyed by (mtime_ns, size). Either way a hit serves the
+encoded bytes straight from memory. Parsed data is decoded lazily, only
+for callers that need it (e.g. the watchlist count in /api/system-status).
+
+In-memory hub snapshots (sector, global context) are encoded once per
+snapshot object instead of once per request.
+
+Responses carry a strong ETag (manifest generation + checksum, or the
+hash of the encoded snapshot) and Last-Modified, with Cache-Control:
+no-cache so browsers always revalidate. A matching If-None-Match or
+If-Modified-Since gets a 304 before the file is read or anything is
+encoded.
+
+Large bodies are served compressed when the client accepts it: brotli if
+the module is installed, otherwise gzip. Each variant is compressed once
+per snapshot (i.e. per generation) and kept next to the plain bytes, and
+carries its own ETag.
+"""
+import os
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi.responses import Response
+
+from backend import serialization
+from backend import cache_manifest
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MAX_ENTRIES = int(os.getenv("SNAPSHOT_CACHE_MAX_ENTRIES", "32"))
+# Below this a compressed body saves less than the headers cost
+COMPRESS_MIN_BYTES = int(os.getenv("SNAPSHOT_COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # multi-MB snapshots: higher qualities take seconds for a few % more
+
+
+def _accepted_encodings(request):
+    accepted = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def negotiate_encoding(request, size):
+    """Content-Encoding to serve a `size`-byte body with, or None for identity."""
+    if request is None or size is None or size < COMPRESS_MIN_BYTES:
+        return None
+    accepted = _accepted_encodings(request)
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def is_not_modified(request, etag, last_modified=None):
+    """True when the request's validators still match (If-None-Match wins over If-Modified-Since)."""
+    if request is None:
+        return False
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+    return False
+
+
+def conditional_response(request, etag, last_modified, load, size=None):
+    """
+    304 when the client's copy is current, otherwise the Snapshot from
+    `load()` (only called when needed), compressed when `size` warrants it
+    and the client accepts it. Validators are sent either way.
+    """
+    encoding = negotiate_encoding(request, size)
+    if encoding:
+        # A compressed representation is a different entity: give it its own strong ETag
+        etag = f'{etag[:-1]}-{encoding}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    if is_not_modified(request, etag, last_modified):
+        snapshot_cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    snapshot = load()
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        return Response(content=snapshot.variant(encoding), media_type=serialization.MEDIA_TYPE, headers=headers)
+    return Response(content=snapshot.body, media_type=serialization.MEDIA_TYPE, headers=headers)
+
+
+def body_etag(body):
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+class Snapshot:
+    def __init__(self, body):
+        self.body = body
+        self.variants = {}
+        self._data = None
+        self._parsed = False
+
+    def variant(self, encoding):
+        """`body` compressed with `encoding`, computed on first use."""
+        compressed = self.variants.get(encoding)
+        if compressed is None:
+            compressed = self.variants[encoding] = compress(self.body, encoding)
+        return compressed
+
+    @property
+    def data(self):
+        if not self._parsed:
+            self._data = serialization.loads(self.body)
+            self._parsed = True
+        return self._data
+
+
+class SnapshotCache:
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # path -> (version, Snapshot)
+        self._encoded = {}              # name -> (source object, Snapshot, etag, encoded at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, path, generation=None):
+        """
+        Snapshot for `path`, re-read only when its generation (if given) or
+        its mtime/size changed.
+        """
+        if generation is not None:
+            key = ("generation", generation)
+        else:
+            st = os.stat(path)
+            key = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._entries.get(path)
+            if cached and cached[0] == key:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        with open(path, "rb") as f:
+            snapshot = Snapshot(f.read())
+        with self._lock:
+            self._entries[path] = (key, snapshot)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def _entry_snapshot(self, entry):
+        return self.get(os.path.join(cache_manifest.CACHE_DIR, entry["file"]), entry.get("generation"))
+
+    def latest(self, kind):
+        """Snapshot of the newest `kind` artifact in the manifest, or None."""
+        entry = cache_manifest.latest_entry(kind)
+        if entry is None:
+            return None
+        return self._entry_snapshot(entry)
+
+    def latest_response(self, kind, request=None):
+        """Conditional response for the newest `kind` artifact, or None when there is none."""
+        entry = cache_manifest.latest_entry(kind)
+        if entry is None:
+            return None
+        etag = f'"{kind}-{entry.get("generation", 0)}-{entry["sha256"][:16]}"'
+        last_modified = datetime.fromisoformat(entry["produced_at"]).timestamp()
+        return conditional_response(request, etag, last_modified, lambda: self._entry_snapshot(entry), entry["size"])
+
+    def encoded(self, name, source, build=None):
+        """
+        (Snapshot, etag, encoded_at) for an in-memory snapshot, encoded once
+        per `source` object. `build(source)` shapes the payload when it wraps
+        the snapshot.
+        """
+        with self._lock:
+            cached = self._encoded.get(name)
+            if cached and cached[0] is source:
+                self.hits += 1
+                return cached[1:]
+            self.misses += 1
+        snapshot = Snapshot(serialization.dumps(build(source) if build else source))
+        etag = body_etag(snapshot.body)
+        with self._lock:
+            previous = self._encoded.get(name)
+            # An unchanged payload keeps its Last-Modified
+            encoded_at = previous[3] if previous and previous[2] == etag else datetime.now().timestamp()
+            self._encoded[name] = (source, snapshot, etag, encoded_at)
+        return snapshot, etag, encoded_at
+
+    def encoded_response(self, name, source, build=None, request=None):
+        snapshot, etag, encoded_at = self.encoded(name, source, build)
+        return conditional_response(request, etag, encoded_at, lambda: snapshot, len(snapshot.body))
+
+    def warm(self, kinds):
+        """
+        Load the newest artifact of each kind ahead of the first request,
+        and precompress the large ones with the encoding browsers will ask for.
+        """
+        loaded = 0
+        encoding = "br" if brotli is not None else "gzip"
+        for kind in kinds:
+            try:
+                snapshot = self.latest(kind)
+            except OSError:
+                continue
+            if snapshot is None:
+                continue
+            loaded += 1
+            if len(snapshot.body) >= COMPRESS_MIN_BYTES:
+                snapshot.variant(encoding)
+        return loaded
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else None,
+                "not_modified": self.not_modified,
+                "entries": len(self._entries),
+                "bytes": sum(
+                    len(s.body) + sum(len(v) for v in s.variants.values())
+                    for _, s in self._entries.values()
+                ),
+            }
+
+
+snapshot_cache = SnapshotCache()
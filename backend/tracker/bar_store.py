@@ -0,0 +1,106 @@
+# backend/tracker/bar_store.py
+import os
+import time
+import numpy as np
+from datetime import datetime
+
+from backend.tracker.candle_io import (
+    empty_block, block_len, slice_block, concat_blocks, save_blocks, load_blocks,
+)
+
+STORE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "cache", "store", "bars"))
+
+INTERVAL_MINUTES = {
+    "1m": 1,
+    "5m": 5,
+    "30m": 30,
+    "1h": 60,
+    "4h": 240,
+    "1d": 1440,
+}
+
+# Bars re-fetched behind the last stored bar so a still-forming bar gets fixed up
+OVERLAP_BARS = 3
+
+
+def _store_path(symbol: str, interval: str) -> str:
+    return os.path.join(STORE_DIR, f"{symbol.upper()}_{interval}.npz")
+
+
+def load_bars(symbol: str, interval: str):
+    """Stored candle block for (symbol, interval); empty when nothing is stored."""
+    path = _store_path(symbol, interval)
+    if not os.path.exists(path):
+        return empty_block()
+    try:
+        blocks, _ = load_blocks(path)
+        return blocks.get("bars", empty_block())
+    except Exception as e:
+        print(f"⚠️ Could not read bar store {path}: {e}")
+        return empty_block()
+
+
+def store_age_seconds(symbol: str, interval: str):
+    """Seconds since the (symbol, interval) store was last written, or None."""
+    path = _store_path(symbol, interval)
+    if not os.path.exists(path):
+        return None
+    return time.time() - os.path.getmtime(path)
+
+
+def save_bars(symbol: str, interval: str, bars):
+    os.makedirs(STORE_DIR, exist_ok=True)
+    save_blocks(_store_path(symbol, interval), {"bars": bars}, {
+        "symbol": symbol.upper(),
+        "interval": interval,
+        "last_ts": int(bars["time"][-1]) if block_len(bars) else None,
+    })
+
+
+def _wall_clock_now():
+    # Same convention as the stored bar times: local wall clock read as UTC
+    return int(np.datetime64(datetime.now(), "s").astype("int64"))
+
+
+def bars_needed(bars, interval: str, max_bars: int) -> int:
+    """
+    How many bars to request so the store catches up to now. Wall-clock
+    elapsed time over-counts across nights/weekends, which only costs a
+    few extra bars.
+    """
+    if not block_len(bars):
+        return max_bars
+    elapsed_minutes = max((_wall_clock_now() - int(bars["time"][-1])) / 60, 0)
+    missing = int(elapsed_minutes // INTERVAL_MINUTES[interval]) + OVERLAP_BARS
+    return min(max(missing, OVERLAP_BARS), max_bars)
+
+
+def merge_bars(stored, fresh, max_bars: int):
+    """Replace stored bars from the first fresh bar time onward, then append."""
+    if not block_len(fresh):
+        return slice_block(stored, slice(-max_bars, None))
+    kept = slice_block(stored, stored["time"] < fresh["time"][0])
+    return slice_block(concat_blocks(kept, fresh), slice(-max_bars, None))
+
+
+def update_bars(symbol: str, interval: str, fetch_fn, max_bars: int):
+    """
+    Bring the (symbol, interval) store up to date and return its bars.
+    fetch_fn(n_bars) must return the newest n_bars as a candle block
+    (or None on failure).
+    """
+    stored = load_bars(symbol, interval)
+    n_bars = bars_needed(stored, interval, max_bars)
+    fresh = fetch_fn(n_bars)
+    if fresh is None:
+        return stored if block_len(stored) else None
+
+    if block_len(stored) and block_len(fresh) and fresh["time"][0] > stored["time"][-1]:
+        # Gap between store and fresh window: fall back to a full reload
+        fresh = fetch_fn(max_bars) or fresh
+        stored = empty_block()
+
+    bars = merge_bars(stored, fresh, max_bars)
+    save_bars(symbol, interval, bars)
+    print(f"🧱 {symbol} @ {interval}: fetched {block_len(fresh)} bars, store holds {block_len(bars)}")
+    return bars
@@ -1,7 +1,11 @@
-import os, json
+import os, sys
 import pandas as pd
 from datetime import datetime
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from backend.tracker.candle_io import block_to_frame, block_len, save_blocks, load_blocks
+from backend.tracker.candle_service import load_raw_candles
+
 CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'cache')
 INTERVALS = {
     "5m": 5,
@@ -12,49 +16,52 @@ INTERVALS = {
     "1d": 1440
 }
 
-def group_candles(raw, interval_minutes):
-    df = pd.DataFrame(raw)
-    if 'timestamp' in df.columns and 'time' not in df.columns:
-        df['time'] = pd.to_datetime(df['timestamp']).astype(int) // 10**9
-    df['dt'] = pd.to_datetime(df['time'], unit='s')
-    df.set_index('dt', inplace=True)
+def group_candles(block, interval_minutes):
+    df = block_to_frame(block)
 
     ohlc = df.resample(f"{interval_minutes}min", label='right', closed='right').agg({
         'open': 'first',
         'high': 'max',
         'low': 'min',
-        'close': 'last'
+        'close': 'last',
+        'volume': 'sum'
     }).dropna()
 
-    ohlc.reset_index(inplace=True)
-    ohlc['time'] = ohlc['dt'].astype('int64') // 10**9
-    return ohlc[['time', 'open', 'high', 'low', 'close']].to_dict(orient='records')
+    grouped = {"time": ohlc.index.as_unit("s").asi8.astype("int64")}
+    for col in ["open", "high", "low", "close", "volume"]:
+        grouped[col] = ohlc[col].to_numpy(dtype="float64")
+    return grouped
 
-def calculate_ema(candles, span):
-    closes = pd.Series([c['close'] for c in candles])
-    ema = closes.ewm(span=span, adjust=False).mean()
-    return [{"time": candles[i]["time"], "value": round(v, 2)} for i, v in enumerate(ema)]
+def calculate_ema(closes, span):
+    return pd.Series(closes).ewm(span=span, adjust=False).mean().round(2).to_numpy()
 
-def build(symbol: str, date: str):
-    input_path = os.path.join(CACHE_DIR, f"tv_candles_{symbol}_{date}.json")
-    output_path = os.path.join(CACHE_DIR, f"tracker_candles_{symbol}_{date}.json")
+def tracker_candles_path(symbol: str, date: str):
+    return os.path.join(CACHE_DIR, f"tracker_candles_{symbol}_{date}.npz")
 
-    if not os.path.exists(input_path):
-        print(f"❌ Missing raw candle file: {input_path}")
-        return
+def load_tracker_candles(path):
+    """{"symbol", "date", "generated_at", "intervals": {interval: block with ema10/ema50}}"""
+    blocks, meta = load_blocks(path)
+    return {**meta, "intervals": blocks}
 
-    with open(input_path, "r") as f:
-        raw = json.load(f)
+def build(symbol: str, date: str, raw=None):
+    input_path = os.path.join(CACHE_DIR, f"tv_candles_{symbol}_{date}.npz")
+    output_path = tracker_candles_path(symbol, date)
 
-    result = {
+    if raw is None:
+        if not os.path.exists(input_path):
+            print(f"❌ Missing raw candle file: {input_path}")
+            return
+        raw = load_raw_candles(input_path)
+
+    meta = {
         "symbol": symbol,
         "date": date,
         "generated_at": datetime.now().isoformat(),
-        "intervals": {}
     }
+    intervals = {}
 
-    raw_5m = raw.get("5m", [])
-    if not raw_5m:
+    raw_5m = raw.get("5m")
+    if not block_len(raw_5m):
         print("❌ No 5m candles in raw file.")
         return
 
@@ -62,40 +69,27 @@ def build(symbol: str, date: str):
         if interval == "10m":
             candles = group_candles(raw_5m, minutes)
         else:
-            candles = raw.get(interval, [])
+            candles = raw.get(interval)
 
-        if not candles:
+        if not block_len(candles):
             print(f"⚠️ Skipping {interval}: no data.")
             continue
 
-        for entry in candles:
-            ts = entry.get("timestamp")
-            if ts:
-                try:
-                    entry["time"] = int(pd.to_datetime(ts).timestamp())
-                except:
-                    entry["time"] = None
-
-        ema10 = calculate_ema(candles, 10)
-        ema50 = calculate_ema(candles, 50)
-
-        result["intervals"][interval] = {
-            "candles": candles,
-            "ema10": ema10,
-            "ema50": ema50
+        intervals[interval] = {
+            **candles,
+            "ema10": calculate_ema(candles["close"], 10),
+            "ema50": calculate_ema(candles["close"], 50),
         }
 
-        print(f"📦 Processed {symbol} @ {interval}: {len(candles)} bars")
+        print(f"📦 Processed {symbol} @ {interval}: {block_len(candles)} bars")
 
-    with open(output_path, "w") as f:
-        json.dump(result, f, indent=2)
+    save_blocks(output_path, intervals, meta)
 
     print(f"✅ Built tracker cache: {output_path}")
+    return {**meta, "intervals": intervals}
 
 # --- CLI Entry Point ---
 if __name__ == "__main__":
-    import sys
-
     if len(sys.argv) not in [2, 3]:
         print("Usage: python build_tracker_candles.py SYMBOL [DATE]")
         sys.exit(1)
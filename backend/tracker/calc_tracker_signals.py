@@ -1,10 +1,15 @@
 import os
-import json
+import sys
 import pandas as pd
 from datetime import datetime, timedelta, time
 import pytz
 import pandas_market_calendars as mcal
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from backend.tracker.candle_service import load_raw_candles
+from backend.tracker.candle_io import block_to_frame
+from backend.publish import publish_json
+
 # --- Config ---
 CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'cache')
 OUTPUT_TEMPLATE = os.path.join(CACHE_DIR, 'tracker_signals_{symbol}.json')
@@ -22,23 +27,17 @@ def determine_trend(ema10, ema50):
 # --- Load Candle Data ---
 def load_data(symbol):
     prefix = f"tv_candles_{symbol.upper()}_"
-    files = [f for f in os.listdir(CACHE_DIR) if f.startswith(prefix) and f.endswith(".json")]
+    files = [f for f in os.listdir(CACHE_DIR) if f.startswith(prefix) and f.endswith(".npz")]
     if not files:
         raise FileNotFoundError(f"No TV data found for {symbol} in {CACHE_DIR}")
     files.sort(reverse=True)
-    path = os.path.join(CACHE_DIR, files[0])
-    with open(path) as f:
-        return json.load(f)
+    return load_raw_candles(os.path.join(CACHE_DIR, files[0]))
 
-# --- Parse Raw JSON to DataFrame ---
+# --- Columnar Candle Block to DataFrame ---
 def parse_df(raw, interval):
-    df = pd.DataFrame(raw[interval])
-    timestamp_key = next((col for col in ['datetime', 'time', 'timestamp'] if col in df.columns), None)
-    if not timestamp_key:
-        raise KeyError("No valid timestamp column found in data")
-    df['timestamp'] = pd.to_datetime(df[timestamp_key]).dt.tz_localize(EASTERN)
-    df.set_index('timestamp', inplace=True)
-    return df.sort_index()
+    if interval not in raw:
+        raise KeyError(f"No {interval} candles in data")
+    return block_to_frame(raw[interval], tz=EASTERN).sort_index()
 
 # --- Get Last N Valid Market Days ---
 def get_recent_market_days(n=3):
@@ -63,8 +62,8 @@ def get_momentum(current_price, prev_hi, prev_lo, pre_hi, pre_lo):
     return "Chop"
 
 # --- Main Signal Calculation ---
-def calc_tracker_signals(symbol):
-    raw = load_data(symbol)
+def calc_tracker_signals(symbol, raw=None):
+    raw = raw or load_data(symbol)
     df_5m = parse_df(raw, '5m')
     df_30m = parse_df(raw, '30m')
     df_1h = parse_df(raw, '1h')
@@ -136,9 +135,9 @@ def calc_tracker_signals(symbol):
     }
 
     out_path = OUTPUT_TEMPLATE.format(symbol=symbol.upper())
-    with open(out_path, "w") as f:
-        json.dump(signals, f, indent=2)
+    publish_json(out_path, signals)
     print(f"✅ Saved tracker_signals_{symbol}.json")
+    return signals
 
 # --- CLI Entry Point ---
 if __name__ == "__main__":
@@ -0,0 +1,99 @@
+# backend/tracker/candle_io.py
+"""
+Columnar candle storage shared by the bar store, the candle service and
+the tracker readers.
+
+A candle block is a dict of equal-length NumPy arrays:
+  time    int64   epoch seconds of the bar's exchange wall-clock time
+                  (naive timestamp read as UTC, the same value the chart
+                  has always used for its "time" axis)
+  open/high/low/close/volume  float64
+Blocks are written as uncompressed .npz, one array per "<block>__<column>"
+entry, so loading is a straight memory copy with no text parsing.
+"""
+import io
+import json
+import numpy as np
+import pandas as pd
+
+from backend.publish import publish_bytes
+
+COLUMNS = ["time", "open", "high", "low", "close", "volume"]
+SEP = "__"
+
+
+def empty_block():
+    return {c: np.array([], dtype="int64" if c == "time" else "float64") for c in COLUMNS}
+
+
+def block_from_frame(df):
+    """TvDatafeed frame (naive DatetimeIndex, lowercase OHLCV) → candle block."""
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    block = {"time": index.as_unit("s").asi8.astype("int64")}
+    for c in COLUMNS[1:]:
+        block[c] = df[c].to_numpy(dtype="float64")
+    return block
+
+
+def block_len(block):
+    return len(block["time"]) if block else 0
+
+
+def slice_block(block, sl):
+    return {c: a[sl] for c, a in block.items()}
+
+
+def concat_blocks(a, b):
+    return {c: np.concatenate([a[c], b[c]]) for c in COLUMNS}
+
+
+def block_to_frame(block, tz=None):
+    """Candle block → DataFrame indexed by bar time (localized to `tz` when given)."""
+    index = pd.to_datetime(block["time"], unit="s")
+    if tz is not None:
+        index = index.tz_localize(tz)
+    return pd.DataFrame({c: block[c] for c in COLUMNS[1:] if c in block}, index=index)
+
+
+def block_to_records(block, with_timestamp=False):
+    """Candle block → list of dicts for JSON responses."""
+    columns = [c for c in block if c != "time"]
+    records = []
+    times = block["time"].tolist()
+    stamps = (
+        pd.to_datetime(block["time"], unit="s").strftime("%Y-%m-%d %H:%M:%S").tolist()
+        if with_timestamp else None
+    )
+    values = {c: block[c].tolist() for c in columns}
+    for i, t in enumerate(times):
+        row = {"time": t}
+        if stamps:
+            row["timestamp"] = stamps[i]
+        for c in columns:
+            row[c] = values[c][i]
+        records.append(row)
+    return records
+
+
+def save_blocks(path, blocks, meta=None):
+    """Write {name: block} plus a small JSON `meta` dict atomically."""
+    arrays = {f"{name}{SEP}{c}": a for name, block in blocks.items() for c, a in block.items()}
+    arrays["_meta"] = np.array(json.dumps(meta or {}))
+    buf = io.BytesIO()
+    np.savez(buf, **arrays)
+    publish_bytes(path, buf.getvalue())
+
+
+def load_blocks(path):
+    """Read a file written by save_blocks → ({name: block}, meta)."""
+    blocks, meta = {}, {}
+    with np.load(path) as data:
+        for key in data.files:
+            if key == "_meta":
+                meta = json.loads(str(data[key]))
+                continue
+            name, column = key.split(SEP, 1)
+            blocks.setdefault(name, {})[column] = data[key]
+    return blocks, meta
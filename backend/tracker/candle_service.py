@@ -0,0 +1,159 @@
+# backend/tracker/candle_service.py
+import os
+import sys
+import time
+import threading
+import traceback
+from collections import defaultdict
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from backend.tracker.bar_store import update_bars, load_bars, store_age_seconds
+from backend.tracker.candle_io import block_from_frame, block_len, save_blocks, load_blocks
+from backend.market_data import get_provider
+
+CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "cache"))
+
+# Bars kept per interval (chart needs the deepest history, dashboard a subset)
+BARS_CONFIG = {
+    "5m": 1000,     # ~1 week
+    "30m": 120,     # ~3–4 weeks
+    "1h": 150,      # ~1 month+
+    "4h": 90,       # ~3 months
+    "1d": 250,      # ~1 year
+}
+DASHBOARD_INTERVALS = ["5m", "30m", "1h"]
+CHART_INTERVALS = ["5m", "30m", "1h", "4h", "1d"]
+
+# A (symbol, interval) fetched within this window is served from the bar store,
+# whichever process fetched it
+FRESHNESS_SECONDS = int(os.getenv("CANDLE_FRESHNESS_SECONDS", "60"))
+
+
+def _tv_interval(label):
+    from tvDatafeed import Interval
+    return {
+        "5m": Interval.in_5_minute,
+        "30m": Interval.in_30_minute,
+        "1h": Interval.in_1_hour,
+        "4h": Interval.in_4_hour,
+        "1d": Interval.in_daily,
+    }[label]
+
+
+def fetch_tv_candles(symbol: str, interval_label: str, bars: int):
+    try:
+        # Enable extended hours only for 5m candles
+        extended = interval_label == "5m"
+
+        df = get_provider().tv_hist(
+            symbol,
+            exchange="",
+            interval=_tv_interval(interval_label),
+            n_bars=bars,
+            extended_session=extended
+        )
+
+        if df is None or df.empty:
+            return None
+        return block_from_frame(df)
+    except Exception as e:
+        print(f"❌ Failed to fetch {symbol} @ {interval_label}: {e}")
+        traceback.print_exc()
+        return None
+
+
+class CandleService:
+    """
+    Single owner of TradingView candle fetches for the tracker. Dashboard
+    signals and chart building both read through it, so a (symbol,
+    interval) pair hits upstream at most once per freshness window;
+    concurrent requests for the same pair wait on one fetch.
+    """
+
+    def __init__(self, freshness_seconds=FRESHNESS_SECONDS):
+        self.freshness_seconds = freshness_seconds
+        self._memo = {}
+        self._key_locks = defaultdict(threading.Lock)
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks[key]
+
+    def get(self, symbol: str, interval: str):
+        symbol = symbol.upper()
+        key = (symbol, interval)
+        with self._key_lock(key):
+            memo = self._memo.get(key)
+            if memo and time.time() - memo[0] < self.freshness_seconds:
+                return memo[1]
+
+            age = store_age_seconds(symbol, interval)
+            if age is not None and age < self.freshness_seconds:
+                # Another process refreshed it moments ago
+                bars = load_bars(symbol, interval)
+            else:
+                bars = update_bars(
+                    symbol, interval,
+                    lambda n: fetch_tv_candles(symbol, interval, n),
+                    BARS_CONFIG[interval],
+                )
+            if block_len(bars):
+                self._memo[key] = (time.time(), bars)
+            return bars
+
+    def get_candles(self, symbol: str, intervals):
+        """{"symbol", "fetchedAt", <interval>: candle block...} for the intervals that returned data."""
+        symbol = symbol.upper()
+        interval_data = {}
+        for label in intervals:
+            bars = self.get(symbol, label)
+            if block_len(bars):
+                interval_data[label] = bars
+        if not interval_data:
+            return None
+        return {"symbol": symbol, "fetchedAt": datetime.now().isoformat(), **interval_data}
+
+    def publish(self, raw, date=None):
+        """
+        Write the columnar raw candle file read by the tracker and
+        /api/raw-candles. Intervals already on disk for today (e.g. 4h/1d
+        from an earlier chart build) are kept when a dashboard refresh
+        only touched the short ones.
+        """
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        out_path = raw_candles_path(raw["symbol"], date)
+        blocks = {}
+        if os.path.exists(out_path):
+            try:
+                blocks, _ = load_blocks(out_path)
+            except Exception:
+                blocks = {}
+        blocks.update({k: v for k, v in raw.items() if isinstance(v, dict)})
+        meta = {"symbol": raw["symbol"], "fetchedAt": raw["fetchedAt"]}
+        save_blocks(out_path, blocks, meta)
+        print(f"✅ Saved: {out_path}")
+        return {**meta, **blocks}
+
+
+def raw_candles_path(symbol, date):
+    return os.path.join(CACHE_DIR, f"tv_candles_{symbol.upper()}_{date}.npz")
+
+
+def load_raw_candles(path):
+    """{"symbol", "fetchedAt", <interval>: candle block...} from a tv_candles_*.npz file."""
+    blocks, meta = load_blocks(path)
+    return {**meta, **blocks}
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_candle_service():
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = CandleService()
+        return _service
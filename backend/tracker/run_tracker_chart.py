@@ -1,10 +1,20 @@
 # backend/tracker/run_tracker_chart.py
-import subprocess
+import os
 import sys
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from backend.tracker.candle_service import get_candle_service, CHART_INTERVALS
+from backend.tracker.build_tracker_candles import build
 
 def run_pipeline(symbol: str):
-    subprocess.run(["python", "backend/tracker/fetch_tv_data.py", "--symbols", symbol], check=True)
-    subprocess.run(["python", "backend/tracker/build_tracker_candles.py", symbol], check=True)
+    """Chart intervals for `symbol`, built in-process from the shared candle service."""
+    service = get_candle_service()
+    raw = service.get_candles(symbol, CHART_INTERVALS)
+    if not raw:
+        raise ValueError(f"No candle data returned for {symbol}")
+    service.publish(raw)
+    return build(symbol, datetime.now().strftime("%Y-%m-%d"), raw)
 
 if __name__ == "__main__":
     if len(sys.argv) != 2:
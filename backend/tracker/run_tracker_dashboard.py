@@ -1,9 +1,18 @@
 # backend/tracker/run_tracker_dashboard.py
-import subprocess, sys
+import os, sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from backend.tracker.candle_service import get_candle_service, DASHBOARD_INTERVALS
+from backend.tracker.calc_tracker_signals import calc_tracker_signals
 
 def run_pipeline(symbol: str):
-    subprocess.run(["python", "backend/tracker/fetch_momentum_data.py", symbol], check=True)
-    subprocess.run(["python", "backend/tracker/calc_tracker_signals.py", symbol], check=True)
+    """Dashboard signals for `symbol`, computed in-process from the shared candle service."""
+    service = get_candle_service()
+    raw = service.get_candles(symbol, DASHBOARD_INTERVALS)
+    if not raw:
+        raise ValueError(f"No candle data returned for {symbol}")
+    service.publish(raw)
+    return calc_tracker_signals(symbol, raw)
 
 if __name__ == "__main__":
     if len(sys.argv) != 2:
@@ -1,7 +1,12 @@
 import os
-import json
 import sys
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from backend import serialization
+from backend import cache_manifest
+from backend.publish import publish_json
+from backend import history_store
+
 # Resolve cache directory relative to this script
 CACHE_DIR = os.path.join(os.path.dirname(__file__), "cache")
 
@@ -13,20 +18,12 @@ def build_autowatchlist(scored_path=None):
     """
     # Determine scored file path
     if scored_path is None:
-        files = [f for f in os.listdir(CACHE_DIR)
-                 if f.startswith("universe_scored_") and f.endswith(".json")]
-        if not files:
+        scored_path = cache_manifest.latest("universe_scored")
+        if scored_path is None:
             raise FileNotFoundError("No scored universe file found in cache.")
-        # pick latest by modification time
-        files.sort(
-            key=lambda f: os.path.getmtime(os.path.join(CACHE_DIR, f)),
-            reverse=True
-        )
-        scored_path = os.path.join(CACHE_DIR, files[0])
 
     # Load scored universe
-    with open(scored_path, "r") as f:
-        universe = json.load(f)
+    universe = serialization.load(scored_path)
 
     watchlist = {}
     for symbol, info in universe.items():
@@ -83,8 +80,8 @@ def build_autowatchlist(scored_path=None):
 
     # Dump autowatchlist cache
     out_path = os.path.join(CACHE_DIR, "autowatchlist_cache.json")
-    with open(out_path, "w") as f:
-        json.dump(watchlist, f, indent=2)
+    publish_json(out_path, watchlist, kind="autowatchlist")
+    history_store.ingest_latest(["autowatchlist"])
 
     return watchlist
 
@@ -9,15 +9,11 @@ tmux new-session -d -s $SESSION
 tmux rename-window -t $SESSION "Scheduler"
 tmux send-keys -t $SESSION "source backend/venv/bin/activate && python3 backend/scheduler.py" C-m
 
-# Step 3: New window for sector websocket
-tmux new-window -t $SESSION -n "SectorWS"
-tmux send-keys -t $SESSION "source backend/venv/bin/activate && python3 backend/signals/sector_signals.py" C-m
-
-# Step 4: New window for FastAPI
+# Step 3: New window for FastAPI (also hosts the sector rotation service)
 tmux new-window -t $SESSION -n "Backend"
 tmux send-keys -t $SESSION "source backend/venv/bin/activate && uvicorn backend.main:app --reload --port 8000" C-m
 
-# Step 5: New window for frontend (Next.js — runs from root)
+# Step 4: New window for frontend (Next.js — runs from root)
 tmux new-window -t $SESSION -n "Frontend"
 tmux send-keys -t $SESSION "npm run dev" C-m
 